@@ -21,8 +21,9 @@ import os
 import subprocess
 import sys
 import time
-from importlib.metadata import PackageNotFoundError, version
+from collections.abc import Sequence
 from pathlib import Path
+from typing import Any
 
 from .archive import ArchiveManager, MockArchiveBackend, RcloneBackend
 from .config import Config, ConfigError, GB, load_from_env, load_from_file, parse_size
@@ -69,12 +70,35 @@ def _run_cmd(cmd: list[str], capture_stdout: bool = False) -> subprocess.Complet
 
 def _get_version() -> str:
     """Get package version, with fallback for development."""
+    # importlib.metadata is slow to import and scans installed packages,
+    # so it is only loaded when --version is actually passed
+    from importlib.metadata import PackageNotFoundError, version
+
     try:
         return version("teslausb")
     except PackageNotFoundError:
         return "dev"
 
 
+class _VersionAction(argparse.Action):
+    """Like argparse's "version" action, but looks the version up lazily."""
+
+    def __init__(
+        self, option_strings: Sequence[str], dest: str = argparse.SUPPRESS, **kwargs: Any
+    ) -> None:
+        super().__init__(option_strings, dest, default=argparse.SUPPRESS, nargs=0, **kwargs)
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: str | Sequence[Any] | None,
+        option_string: str | None = None,
+    ) -> None:
+        print(f"{parser.prog} {_get_version()}")
+        parser.exit()
+
+
 def configure_logging(log_level: str) -> None:
     """Configure logging based on level name."""
     level = getattr(logging, log_level.upper(), logging.WARNING)
@@ -904,7 +928,7 @@ def main() -> int:
         prog="teslausb",
     )
     parser.add_argument(
-        "--version", action="version", version=f"%(prog)s {_get_version()}"
+        "--version", action=_VersionAction, help="show program's version number and exit"
     )
     env_log_level = os.environ.get("LOG_LEVEL", "").lower()
     parser.add_argument(
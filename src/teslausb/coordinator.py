@@ -213,12 +213,18 @@ class Coordinator:
         """
         self._set_state(CoordinatorState.ARCHIVING)
 
+        # Pick up snapshots created or removed by another process (e.g. the
+        # CLI) since the last cycle; a single stat() when nothing changed.
+        self.snapshot_manager.refresh()
+
         # Delete all stale snapshots before creating a new one.
         # Snapshots pin COW blocks — the car keeps writing via the USB gadget,
         # and old snapshots prevent XFS from reclaiming space.
         stale = 0
         while self.snapshot_manager.delete_oldest_if_deletable():
             stale += 1
+        if stale:
+            self.space_manager.invalidate()
         if stale == 1:
             # One stale snapshot is expected after an unclean shutdown —
             # the post-archive deletion didn't run.
@@ -253,6 +259,9 @@ class Coordinator:
                 mount_fn=self.config.mount_fn,
                 delete_after_archive=False,
             )
+            if result.snapshot_id is not None:
+                # The new snapshot changed free space; don't serve the cached value
+                self.space_manager.invalidate()
             self._last_archive = result
             self._archive_count += 1
 
@@ -274,6 +283,7 @@ class Coordinator:
             if result.snapshot_id is not None:
                 try:
                     self.snapshot_manager.delete_snapshot(result.snapshot_id)
+                    self.space_manager.invalidate()
                 except Exception as e:
                     logger.warning(
                         f"Failed to delete snapshot {result.snapshot_id} "
@@ -309,7 +319,7 @@ class Coordinator:
         After disabling the gadget, we run fsck to repair any FAT errors
         from the car's abrupt disconnection, then mount and delete files.
         """
-        from .mount import fsck_image, mount_image
+        from .mount import mount_image
 
         gadget = self.config.gadget
         gadget_was_enabled = False
@@ -329,12 +339,10 @@ class Coordinator:
             gadget_was_enabled = True
 
         try:
-            # Repair any FAT errors from the car's abrupt disconnection
+            # Repair any FAT errors from the car's abrupt disconnection, then
+            # mount on the same loop device
             cam_disk = self.archive_manager.cam_disk_path
-            if not fsck_image(cam_disk):
-                logger.warning("fsck failed, proceeding with mount anyway")
-
-            with mount_image(cam_disk, readonly=False) as cam_mount:
+            with mount_image(cam_disk, readonly=False, fsck=True) as cam_mount:
                 deleted, skipped = self.archive_manager.delete_archived_files(result, cam_mount)
                 logger.info(f"Cleanup complete: {deleted} deleted, {skipped} skipped")
         except Exception as e:
@@ -63,6 +63,8 @@ class StatResult:
 
     size: int
     mtime: float
+    # Exact, for detecting changes; mtime can round two updates to one value
+    mtime_ns: int
     is_dir: bool
     is_file: bool
 
@@ -89,6 +91,15 @@ class StatVfsResult:
         return self.block_size * self.available_blocks
 
 
+@dataclass
+class DirEntry:
+    """Directory entry returned by scandir(), with its type already known."""
+
+    name: str
+    is_dir: bool
+    is_file: bool
+
+
 class FilesystemError(Exception):
     """Base exception for filesystem errors."""
 
@@ -132,6 +143,10 @@ class Filesystem(ABC):
     def listdir(self, path: Path) -> list[str]:
         """List directory contents."""
 
+    @abstractmethod
+    def scandir(self, path: Path) -> list[DirEntry]:
+        """List directory contents along with each entry's type."""
+
     @abstractmethod
     def walk(self, path: Path) -> Iterator[tuple[Path, list[str], list[str]]]:
         """Walk directory tree, yielding (dirpath, dirnames, filenames)."""
@@ -203,6 +218,7 @@ class RealFilesystem(Filesystem):
             return StatResult(
                 size=st.st_size,
                 mtime=st.st_mtime,
+                mtime_ns=st.st_mtime_ns,
                 is_dir=path.is_dir(),
                 is_file=path.is_file(),
             )
@@ -214,12 +230,13 @@ class RealFilesystem(Filesystem):
     def statvfs(self, path: Path) -> StatVfsResult:
         try:
             # Flush the XFS journal so freed blocks are visible to statvfs.
-            fd = os.open(str(path), os.O_RDONLY)
+            # fstatvfs() on the same descriptor avoids a second path lookup.
+            fd = os.open(path, os.O_RDONLY)
             try:
                 _syncfs(fd)
+                st = os.fstatvfs(fd)
             finally:
                 os.close(fd)
-            st = os.statvfs(path)
             return StatVfsResult(
                 block_size=st.f_frsize,
                 total_blocks=st.f_blocks,
@@ -239,6 +256,17 @@ class RealFilesystem(Filesystem):
         except PermissionError as e:
             raise PermissionError_(str(path)) from e
 
+    def scandir(self, path: Path) -> list[DirEntry]:
+        # The entry type comes from readdir's d_type, so no per-entry stat
+        # is needed (except for symlinks, which are followed like is_dir())
+        try:
+            with os.scandir(path) as entries:
+                return [DirEntry(e.name, e.is_dir(), e.is_file()) for e in entries]
+        except FileNotFoundError as e:
+            raise FileNotFoundError_(str(path)) from e
+        except PermissionError as e:
+            raise PermissionError_(str(path)) from e
+
     def walk(self, path: Path) -> Iterator[tuple[Path, list[str], list[str]]]:
         for dirpath, dirnames, filenames in os.walk(path):
             yield Path(dirpath), dirnames, filenames
@@ -358,14 +386,14 @@ class MockFile:
     """Represents a file in the mock filesystem."""
 
     content: bytes = b""
-    mtime: float = 0.0
+    mtime_ns: int = 0
 
 
 @dataclass
 class MockDir:
     """Represents a directory in the mock filesystem."""
 
-    mtime: float = 0.0
+    mtime_ns: int = 0
 
 
 @dataclass
@@ -373,7 +401,7 @@ class MockSymlink:
     """Represents a symbolic link in the mock filesystem."""
 
     target: Path
-    mtime: float = 0.0
+    mtime_ns: int = 0
 
 
 @dataclass
@@ -392,6 +420,9 @@ class MockFilesystem(Filesystem):
     _total_bytes: int = 100 * 1024 * 1024 * 1024  # 100 GB default
     _block_size: int = 4096
 
+    # Source of directory mtimes; advances on every entry added or removed
+    _mtime_clock: int = 0
+
     def __post_init__(self) -> None:
         # Root always exists
         self._dirs[Path("/")] = MockDir()
@@ -402,6 +433,12 @@ class MockFilesystem(Filesystem):
             path = Path("/") / path
         return path.resolve()
 
+    def _touch_dir(self, path: Path) -> None:
+        """Update a directory's mtime, as adding or removing an entry would."""
+        self._mtime_clock += 1
+        if path in self._dirs:
+            self._dirs[path].mtime_ns = self._mtime_clock
+
     def _used_bytes(self) -> int:
         """Calculate total used bytes."""
         return sum(len(f.content) for f in self._files.values())
@@ -447,11 +484,19 @@ class MockFilesystem(Filesystem):
 
         if path in self._files:
             f = self._files[path]
-            return StatResult(size=len(f.content), mtime=f.mtime, is_dir=False, is_file=True)
+            return StatResult(
+                size=len(f.content),
+                mtime=f.mtime_ns / 1e9,
+                mtime_ns=f.mtime_ns,
+                is_dir=False,
+                is_file=True,
+            )
 
         if path in self._dirs:
             d = self._dirs[path]
-            return StatResult(size=0, mtime=d.mtime, is_dir=True, is_file=False)
+            return StatResult(
+                size=0, mtime=d.mtime_ns / 1e9, mtime_ns=d.mtime_ns, is_dir=True, is_file=False
+            )
 
         raise FileNotFoundError_(str(path))
 
@@ -486,6 +531,13 @@ class MockFilesystem(Filesystem):
 
         return sorted(entries)
 
+    def scandir(self, path: Path) -> list[DirEntry]:
+        path = self._normalize(path)
+        return [
+            DirEntry(name, self.is_dir(path / name), self.is_file(path / name))
+            for name in self.listdir(path)
+        ]
+
     def walk(self, path: Path) -> Iterator[tuple[Path, list[str], list[str]]]:
         path = self._normalize(path)
         if path not in self._dirs:
@@ -525,6 +577,7 @@ class MockFilesystem(Filesystem):
                 raise FileNotFoundError_(str(parent))
 
         self._dirs[path] = MockDir()
+        self._touch_dir(parent)
 
     def remove(self, path: Path) -> None:
         path = self._normalize(path)
@@ -535,6 +588,7 @@ class MockFilesystem(Filesystem):
             del self._files[path]
         else:
             raise FileNotFoundError_(str(path))
+        self._touch_dir(path.parent)
 
     def rmtree(self, path: Path) -> None:
         path = self._normalize(path)
@@ -555,6 +609,7 @@ class MockFilesystem(Filesystem):
             del self._symlinks[p]
         for p in sorted(to_remove_dirs, reverse=True):  # Remove deepest first
             del self._dirs[p]
+        self._touch_dir(path.parent)
 
     def rmdir(self, path: Path) -> None:
         path = self._normalize(path)
@@ -571,6 +626,7 @@ class MockFilesystem(Filesystem):
             raise FilesystemError(f"Directory not empty: {path}")
 
         del self._dirs[path]
+        self._touch_dir(path.parent)
 
     def copy(self, src: Path, dst: Path) -> None:
         src = self._normalize(src)
@@ -585,7 +641,11 @@ class MockFilesystem(Filesystem):
         if dst.parent not in self._dirs:
             raise FileNotFoundError_(str(dst.parent))
 
-        self._files[dst] = MockFile(content=self._files[src].content, mtime=self._files[src].mtime)
+        if dst not in self._files:
+            self._touch_dir(dst.parent)
+        self._files[dst] = MockFile(
+            content=self._files[src].content, mtime_ns=self._files[src].mtime_ns
+        )
 
     def copy_reflink(self, src: Path, dst: Path) -> None:
         # In mock, reflink is same as copy (no COW simulation)
@@ -601,6 +661,8 @@ class MockFilesystem(Filesystem):
         path = self._normalize(path)
         if path.parent not in self._dirs:
             raise FileNotFoundError_(str(path.parent))
+        if path not in self._files:
+            self._touch_dir(path.parent)
         self._files[path] = MockFile(content=content.encode("utf-8"))
 
     def write_bytes(self, path: Path, content: bytes) -> None:
@@ -608,6 +670,8 @@ class MockFilesystem(Filesystem):
         path = self._normalize(path)
         if path.parent not in self._dirs:
             raise FileNotFoundError_(str(path.parent))
+        if path not in self._files:
+            self._touch_dir(path.parent)
         self._files[path] = MockFile(content=content)
 
     def rename(self, src: Path, dst: Path) -> None:
@@ -646,12 +710,15 @@ class MockFilesystem(Filesystem):
                 self._symlinks[new_path] = s
         else:
             raise FileNotFoundError_(str(src))
+        self._touch_dir(src.parent)
+        self._touch_dir(dst.parent)
 
     def symlink(self, src: Path, dst: Path) -> None:
         dst = self._normalize(dst)
         if dst.parent not in self._dirs:
             raise FileNotFoundError_(str(dst.parent))
         self._symlinks[dst] = MockSymlink(target=src)
+        self._touch_dir(dst.parent)
 
     def readlink(self, path: Path) -> Path:
         path = self._normalize(path)
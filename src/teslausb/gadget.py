@@ -9,9 +9,12 @@ The gadget is configured via configfs at /sys/kernel/config/usb_gadget/.
 from __future__ import annotations
 
 import logging
+import os
 import subprocess
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
@@ -32,11 +35,11 @@ def _run_modprobe(module: str) -> bool:
             check=False,
         )
         if result.returncode == 0:
-            logger.info(f"Loaded kernel module: {module}")
+            logger.info("Loaded kernel module: %s", module)
             return True
         else:
             stderr = result.stderr.decode().strip()
-            logger.warning(f"Failed to load {module}: {stderr}")
+            logger.warning("Failed to load %s: %s", module, stderr)
             return False
     except FileNotFoundError:
         logger.warning("modprobe not found")
@@ -64,6 +67,36 @@ class LunConfig:
     cdrom: bool = False
 
 
+def _check_disk_images(configs: Iterable[LunConfig]) -> None:
+    """Verify that every LUN's disk image exists.
+
+    Images are grouped by parent directory, which is opened once with
+    O_PATH so each image is checked relative to it rather than by
+    re-resolving its full path.
+
+    Args:
+        configs: LUN configurations to check
+
+    Raises:
+        GadgetError: If a disk image is missing
+    """
+    by_parent: dict[Path, list[Path]] = {}
+    for config in configs:
+        by_parent.setdefault(config.disk_path.parent, []).append(config.disk_path)
+
+    for parent, disk_paths in by_parent.items():
+        try:
+            dir_fd = os.open(parent, os.O_PATH | os.O_DIRECTORY)
+        except OSError:
+            raise GadgetError(f"Disk image not found: {disk_paths[0]}") from None
+        try:
+            for disk_path in disk_paths:
+                if not os.access(disk_path.name, os.F_OK, dir_fd=dir_fd):
+                    raise GadgetError(f"Disk image not found: {disk_path}")
+        finally:
+            os.close(dir_fd)
+
+
 class UsbGadget:
     """USB mass storage gadget using Linux configfs.
 
@@ -100,6 +133,7 @@ class UsbGadget:
         self.configfs = configfs
         self.path = configfs / name
         self._udc_path = Path("/sys/class/udc")
+        self._udc_cached: str | None = None
 
     def _write(self, path: Path, value: str) -> None:
         """Write value to a configfs file.
@@ -108,7 +142,7 @@ class UsbGadget:
         configfs store handler strips trailing whitespace, and a
         zero-byte write (empty string without newline) may be ignored.
         """
-        logger.debug(f"Writing '{value}' to {path}")
+        logger.debug("Writing %r to %s", value, path)
         path.write_text(value + "\n")
 
     def _read(self, path: Path) -> str:
@@ -118,20 +152,28 @@ class UsbGadget:
     def _get_udc(self) -> str:
         """Get available USB Device Controller name.
 
+        The UDC name is static for a given boot, so the first lookup is
+        cached. The cache is cleared if binding to the UDC fails.
+
         Returns:
             Name of the first available UDC
 
         Raises:
             GadgetError: If no UDC is available
         """
+        if self._udc_cached is not None:
+            return self._udc_cached
+
         if not self._udc_path.exists():
             raise GadgetError(f"UDC path {self._udc_path} does not exist")
 
-        udcs = list(self._udc_path.iterdir())
-        if not udcs:
+        with os.scandir(self._udc_path) as it:
+            entry = next(it, None)
+        if entry is None:
             raise GadgetError("No USB Device Controller found")
 
-        return udcs[0].name
+        self._udc_cached = entry.name
+        return entry.name
 
     def initialize(self, luns: dict[int, LunConfig]) -> None:
         """Create gadget structure in configfs.
@@ -144,7 +186,7 @@ class UsbGadget:
             GadgetError: If initialization fails
         """
         if self.is_initialized():
-            logger.info(f"Gadget {self.name} already initialized")
+            logger.info("Gadget %s already initialized", self.name)
             return
 
         if not luns:
@@ -172,11 +214,9 @@ class UsbGadget:
                 )
 
         # Check that cam_disk exists
-        for lun_id, config in luns.items():
-            if not config.disk_path.exists():
-                raise GadgetError(f"Disk image not found: {config.disk_path}")
+        _check_disk_images(luns.values())
 
-        logger.info(f"Initializing gadget {self.name} with {len(luns)} LUN(s)")
+        logger.info("Initializing gadget %s with %d LUN(s)", self.name, len(luns))
 
         try:
             # Create gadget directory
@@ -218,10 +258,10 @@ class UsbGadget:
             if not link.exists():
                 link.symlink_to(func)
 
-            logger.info(f"Gadget {self.name} initialized")
+            logger.info("Gadget %s initialized", self.name)
 
         except OSError as e:
-            logger.error(f"Failed to initialize gadget: {e}")
+            logger.error("Failed to initialize gadget: %s", e)
             # Try to clean up partial initialization
             self._cleanup_partial()
             raise GadgetError(f"Failed to initialize gadget: {e}") from e
@@ -240,7 +280,7 @@ class UsbGadget:
         if lun_id > 0:
             lun.mkdir(exist_ok=True)
 
-        logger.debug(f"Configuring LUN {lun_id}: {config.disk_path}")
+        logger.debug("Configuring LUN %d: %s", lun_id, config.disk_path)
 
         self._write(lun / "removable", "1" if config.removable else "0")
         self._write(lun / "ro", "1" if config.readonly else "0")
@@ -265,7 +305,7 @@ class UsbGadget:
         if not self.is_initialized():
             return
 
-        logger.info(f"Removing gadget {self.name}")
+        logger.info("Removing gadget %s", self.name)
 
         # Must disable first
         self.disable()
@@ -302,10 +342,10 @@ class UsbGadget:
             # Remove gadget
             self.path.rmdir()
 
-            logger.info(f"Gadget {self.name} removed")
+            logger.info("Gadget %s removed", self.name)
 
         except OSError as e:
-            logger.error(f"Failed to remove gadget: {e}")
+            logger.error("Failed to remove gadget: %s", e)
             raise GadgetError(f"Failed to remove gadget: {e}") from e
 
     def enable(self) -> None:
@@ -322,11 +362,13 @@ class UsbGadget:
             return
 
         udc = self._get_udc()
-        logger.info(f"Enabling gadget {self.name} on {udc}")
+        logger.info("Enabling gadget %s on %s", self.name, udc)
 
         try:
             self._write(self.path / "UDC", udc)
         except OSError as e:
+            # The controller may have gone away; rescan on the next attempt
+            self._udc_cached = None
             raise GadgetError(f"Failed to enable gadget: {e}") from e
 
     def disable(self) -> None:
@@ -334,12 +376,12 @@ class UsbGadget:
         if not self.is_enabled():
             return
 
-        logger.info(f"Disabling gadget {self.name}")
+        logger.info("Disabling gadget %s", self.name)
 
         try:
             self._write(self.path / "UDC", "")
         except OSError as e:
-            logger.warning(f"Failed to disable gadget: {e}")
+            logger.warning("Failed to disable gadget: %s", e)
 
     def is_enabled(self) -> bool:
         """Check if gadget is bound to UDC.
@@ -409,6 +451,7 @@ class MockGadget:
         self._initialized = False
         self._enabled = False
         self.luns: dict[int, LunConfig] = {}
+        self._lun_status: dict[int, Mapping[str, str | bool]] = {}
         self.enable_count = 0
         self.disable_count = 0
 
@@ -417,6 +460,11 @@ class MockGadget:
         if not luns:
             raise GadgetError("At least one LUN must be configured")
         self.luns = {k: v for k, v in luns.items()}
+        self._lun_status = {
+            # Read-only, so get_status() can share them without copying each one
+            k: MappingProxyType({"file": str(v.disk_path), "readonly": v.readonly})
+            for k, v in self.luns.items()
+        }
         self._initialized = True
 
     def remove(self) -> None:
@@ -424,6 +472,7 @@ class MockGadget:
         self._enabled = False
         self._initialized = False
         self.luns.clear()
+        self._lun_status = {}
 
     def enable(self) -> None:
         """Enable mock gadget."""
@@ -453,8 +502,6 @@ class MockGadget:
             "initialized": self._initialized,
             "enabled": self._enabled,
             "udc": "mock-udc" if self._enabled else None,
-            "luns": {
-                k: {"file": str(v.disk_path), "readonly": v.readonly}
-                for k, v in self.luns.items()
-            },
+            # Copy so callers can't add or remove the mock's LUNs through the status
+            "luns": dict(self._lun_status),
         }
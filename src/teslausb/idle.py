@@ -13,7 +13,8 @@ The detection uses a state machine:
 from __future__ import annotations
 
 import logging
-import re
+import os
+import select
 import time
 from dataclasses import dataclass
 from enum import Enum
@@ -76,6 +77,10 @@ class ProcIdleDetector:
     when the car has stopped writing to the USB mass storage device.
     """
 
+    # The state machine runs on plain ints; IdleState is only built for get_status()
+    _UNDETERMINED, _WRITING, _IDLE = 0, 1, 2
+    _STATES = (IdleState.UNDETERMINED, IdleState.WRITING, IdleState.IDLE)
+
     def __init__(
         self,
         proc_path: Path = Path("/proc"),
@@ -89,10 +94,16 @@ class ProcIdleDetector:
         """
         self.proc_path = proc_path
         self.process_name = process_name
-        self._state = IdleState.UNDETERMINED
+        # /proc/{pid}/comm holds the name (at most 15 bytes) plus a newline
+        self._process_name_bytes = (process_name + "\n").encode()
+        self._state_int = self._UNDETERMINED
         self._prev_written = -1
         self._burst_size = 0
         self._idle_count = 0
+        self._cached_pid: int | None = None
+        self._io_fd: int | None = None
+        self._io_pid: int | None = None
+        self._pidfd: int | None = None
 
     def _find_process_pid(self) -> int | None:
         """Find PID of the mass storage process.
@@ -100,39 +111,140 @@ class ProcIdleDetector:
         Returns:
             Process ID if found, None otherwise
         """
-        for proc_dir in self.proc_path.iterdir():
-            if not proc_dir.name.isdigit():
-                continue
-
-            try:
-                comm_file = proc_dir / "comm"
-                if comm_file.exists():
-                    comm = comm_file.read_text().strip()
-                    if comm == self.process_name:
-                        return int(proc_dir.name)
-            except (PermissionError, FileNotFoundError, ProcessLookupError):
-                continue
+        with os.scandir(self.proc_path) as entries:
+            for entry in entries:
+                # PID directories are the only /proc entries starting with a digit
+                if not "0" <= entry.name[0] <= "9":
+                    continue
+
+                try:
+                    fd = os.open(entry.path + "/comm", os.O_RDONLY)
+                except (PermissionError, FileNotFoundError, ProcessLookupError):
+                    continue
+                try:
+                    comm = os.read(fd, 16)
+                except OSError:
+                    continue
+                finally:
+                    os.close(fd)
+
+                if comm == self._process_name_bytes:
+                    return int(entry.name)
 
         return None
 
+    def _sample_process(self) -> int | None:
+        """Get write_bytes for the mass storage process.
+
+        Reuses the cached PID and only rescans /proc once it has exited.
+
+        Returns:
+            Bytes written, or None if unavailable. The cached PID is None
+            afterwards if no mass storage process is running.
+        """
+        written = None
+        if self._cached_pid is not None:
+            written = self._get_write_bytes(self._cached_pid)
+            if written is None and not (self.proc_path / str(self._cached_pid)).exists():
+                self._cached_pid = None
+        if self._cached_pid is None:
+            self._close_pidfd()
+            self._cached_pid = self._find_process_pid()
+            if self._cached_pid is None:
+                return None
+            written = self._get_write_bytes(self._cached_pid)
+        if self._pidfd is None:
+            self._pidfd = self._open_pidfd(self._cached_pid)
+        return written
+
+    def _open_pidfd(self, pid: int) -> int | None:
+        """Open a pidfd for the mass storage process.
+
+        A pidfd pins the process (its PID can't be reused while open) and
+        becomes readable when it exits, so the wait can end immediately.
+
+        Args:
+            pid: Process ID
+
+        Returns:
+            pidfd, or None if unavailable (no pidfd_open, or a non-default
+            proc_path whose PIDs aren't real)
+        """
+        if self.proc_path != Path("/proc") or not hasattr(os, "pidfd_open"):
+            return None
+        try:
+            return os.pidfd_open(pid)
+        except OSError:
+            return None
+
+    def _close_pidfd(self) -> None:
+        """Close the pidfd, if any."""
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+
+    def _wait_for_exit(self, seconds: float) -> bool:
+        """Sleep, waking early if the mass storage process exits.
+
+        Args:
+            seconds: Time to sleep
+
+        Returns:
+            True if the process exited
+        """
+        if self._pidfd is None:
+            time.sleep(seconds)
+            return False
+        return bool(select.select([self._pidfd], [], [], seconds)[0])
+
     def _get_write_bytes(self, pid: int) -> int | None:
         """Get write_bytes from /proc/{pid}/io.
 
+        The io file is kept open between samples and re-read from offset 0,
+        so each sample is a single pread() with no path lookup or decode.
+
         Args:
             pid: Process ID
 
         Returns:
             Bytes written, or None if unavailable
         """
-        io_path = self.proc_path / str(pid) / "io"
+        fd = self._io_fd
+        if fd is None or pid != self._io_pid:
+            self._close_io_fd()
+            try:
+                fd = os.open(self.proc_path / str(pid) / "io", os.O_RDONLY)
+            except OSError:
+                return None
+            self._io_fd, self._io_pid = fd, pid
+
         try:
-            content = io_path.read_text()
-            match = re.search(r"write_bytes:\s*(\d+)", content)
-            if match:
-                return int(match.group(1))
-        except (PermissionError, FileNotFoundError, ProcessLookupError):
-            pass
-        return None
+            buf = os.pread(fd, 512, 0)
+        except OSError:
+            # ESRCH once the process has exited
+            self._close_io_fd()
+            return None
+
+        start = buf.find(b"write_bytes:")
+        if start < 0:
+            return None
+        end = buf.find(b"\n", start)
+        try:
+            return int(buf[start + 12 : end if end >= 0 else len(buf)])
+        except ValueError:
+            return None
+
+    def _close_io_fd(self) -> None:
+        """Close the kept-open io file, if any."""
+        if self._io_fd is not None:
+            os.close(self._io_fd)
+            self._io_fd = None
+            self._io_pid = None
+
+    def _close_fds(self) -> None:
+        """Close the kept-open io file and pidfd, if any."""
+        self._close_io_fd()
+        self._close_pidfd()
 
     def wait_for_idle(self, timeout: float = DEFAULT_TIMEOUT) -> bool:
         """Wait for the car to become idle.
@@ -148,24 +260,32 @@ class ProcIdleDetector:
         Returns:
             True if idle detected, False if timeout
         """
-        self._state = IdleState.UNDETERMINED
+        self._state_int = self._UNDETERMINED
         self._prev_written = -1
         self._burst_size = 0
         self._idle_count = 0
 
-        logger.info(f"Waiting up to {timeout:.0f} seconds for idle")
+        logger.info("Waiting up to %.0f seconds for idle", timeout)
 
+        try:
+            return self._sample_until_idle(timeout)
+        finally:
+            self._close_fds()
+
+    def _sample_until_idle(self, timeout: float) -> bool:
+        """Sample write_bytes and run the idle state machine until idle or timeout."""
         start_time = time.monotonic()
         while (time.monotonic() - start_time) < timeout:
-            time.sleep(1)
+            if self._wait_for_exit(1):
+                logger.info("Mass storage process exited, OK to proceed")
+                self._state_int = self._IDLE
+                return True
 
-            pid = self._find_process_pid()
-            if pid is None:
+            written = self._sample_process()
+            if written is None and self._cached_pid is None:
                 logger.info("Mass storage process not active, OK to proceed")
-                self._state = IdleState.IDLE
+                self._state_int = self._IDLE
                 return True
-
-            written = self._get_write_bytes(pid)
             if written is None:
                 continue
 
@@ -176,33 +296,31 @@ class ProcIdleDetector:
             delta = written - self._prev_written
             self._prev_written = written
 
-            if self._state == IdleState.UNDETERMINED:
+            if self._state_int == self._UNDETERMINED:
                 if delta > WRITE_THRESHOLD:
                     logger.info("Write in progress")
-                    self._state = IdleState.WRITING
+                    self._state_int = self._WRITING
                     self._burst_size = delta
 
-            elif self._state == IdleState.WRITING:
+            elif self._state_int == self._WRITING:
                 if delta < WRITE_THRESHOLD:
-                    logger.info(f"No longer writing, wrote {self._burst_size} bytes")
-                    self._state = IdleState.IDLE
+                    logger.info("No longer writing, wrote %d bytes", self._burst_size)
+                    self._state_int = self._IDLE
                     self._burst_size = 0
                     self._idle_count = 0
                 else:
                     self._burst_size += delta
 
-            elif self._state == IdleState.IDLE:
+            elif self._state_int == self._IDLE:
                 if delta > WRITE_THRESHOLD:
                     logger.info("Going back to writing state")
-                    self._state = IdleState.WRITING
+                    self._state_int = self._WRITING
                     self._burst_size = delta
                     self._idle_count = 0
                 else:
                     self._idle_count += 1
                     if self._idle_count >= IDLE_CONFIRM_SECONDS:
-                        logger.info(
-                            f"No writes seen in the last {IDLE_CONFIRM_SECONDS} seconds"
-                        )
+                        logger.info("No writes seen in the last %d seconds", IDLE_CONFIRM_SECONDS)
                         return True
 
         logger.warning("Couldn't determine idle interval")
@@ -211,7 +329,7 @@ class ProcIdleDetector:
     def get_status(self) -> IdleStatus:
         """Get current idle status."""
         return IdleStatus(
-            state=self._state,
+            state=self._STATES[self._state_int],
             bytes_written=self._prev_written if self._prev_written >= 0 else 0,
             burst_size=self._burst_size,
             idle_seconds=self._idle_count,
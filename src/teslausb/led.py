@@ -12,7 +12,9 @@ LED patterns:
 
 from __future__ import annotations
 
+import functools
 import logging
+import os
 from enum import Enum
 from pathlib import Path
 from typing import Protocol
@@ -20,13 +22,71 @@ from typing import Protocol
 logger = logging.getLogger(__name__)
 
 # Common LED paths on Raspberry Pi
-LED_PATHS = [
+LED_PATHS = (
     "/sys/class/leds/led0",  # Pi Zero, Pi 3
     "/sys/class/leds/ACT",  # Pi 4, Pi 5
     "/sys/class/leds/status",
     "/sys/class/leds/user-led2",  # Some boards
     "/sys/class/leds/radxa-zero:green",  # Radxa Zero
-]
+)
+
+# Attributes owned by the LED core. Trigger attributes (delay_on, delay_off,
+# invert) are removed and recreated by the kernel when the trigger changes.
+LED_CORE_ATTRIBUTES = ("trigger", "brightness")
+
+
+@functools.cache
+def _find_led_path(led_paths: tuple[str, ...]) -> Path | None:
+    """Find the first existing LED directory.
+
+    The set of LEDs doesn't change at runtime, so the result is cached.
+
+    Args:
+        led_paths: Candidate LED directories, in order of preference
+
+    Returns:
+        Path to LED directory, or None if not found
+    """
+    for led_str in led_paths:
+        led_path = Path(led_str)
+        if led_path.exists():
+            return led_path
+    return None
+
+
+@functools.cache
+def _load_triggers(led_path: Path) -> frozenset[str]:
+    """Read and cache the triggers an LED supports.
+
+    Failures raise instead of returning, so they aren't cached and the
+    next controller for the LED tries again.
+
+    Raises:
+        OSError: If the trigger file can't be read
+        ValueError: If the trigger file lists no triggers
+    """
+    content = (led_path / "trigger").read_text()
+    # Triggers are listed with current in [brackets]
+    triggers = frozenset(content.replace("[", "").replace("]", "").split())
+    if not triggers:
+        raise ValueError(f"no triggers listed in {led_path / 'trigger'}")
+    return triggers
+
+
+def _read_triggers(led_path: Path) -> frozenset[str]:
+    """Read the triggers an LED supports.
+
+    Args:
+        led_path: Path to LED directory
+
+    Returns:
+        Available trigger names (empty if the trigger file can't be read)
+    """
+    try:
+        return _load_triggers(led_path)
+    except (PermissionError, FileNotFoundError, ValueError) as e:
+        logger.warning("Cannot read LED triggers: %s", e)
+        return frozenset()
 
 
 class LedPattern(Enum):
@@ -65,11 +125,12 @@ class SysfsLedController:
         """
         self._led_path = led_path or self._find_led()
         self._pattern = LedPattern.OFF
-        self._available_triggers: set[str] = set()
+        self._available_triggers: frozenset[str] = frozenset()
+        self._fds: dict[str, int] = {}
 
         if self._led_path:
             self._load_triggers()
-            logger.info(f"Using LED: {self._led_path}")
+            logger.info("Using LED: %s", self._led_path)
         else:
             logger.warning("No LED found, LED control disabled")
 
@@ -79,28 +140,22 @@ class SysfsLedController:
         Returns:
             Path to LED directory, or None if not found
         """
-        for led_str in LED_PATHS:
-            led_path = Path(led_str)
-            if led_path.exists():
-                return led_path
-        return None
+        return _find_led_path(LED_PATHS)
 
     def _load_triggers(self) -> None:
         """Load available LED triggers."""
         if not self._led_path:
             return
 
-        trigger_file = self._led_path / "trigger"
-        try:
-            content = trigger_file.read_text()
-            # Triggers are listed with current in [brackets]
-            self._available_triggers = set(content.replace("[", "").replace("]", "").split())
-        except (PermissionError, FileNotFoundError) as e:
-            logger.warning(f"Cannot read LED triggers: {e}")
+        self._available_triggers = _read_triggers(self._led_path)
 
     def _write_file(self, name: str, value: str) -> bool:
         """Write to an LED control file.
 
+        Control files are opened on first use and kept open, so repeated
+        pattern changes cost a write (plus a truncate, which sysfs ignores)
+        instead of an open/write/close per attribute.
+
         Args:
             name: File name (e.g., "trigger", "delay_on")
             value: Value to write
@@ -111,14 +166,39 @@ class SysfsLedController:
         if not self._led_path:
             return False
 
-        file_path = self._led_path / name
+        data = value.encode()
         try:
-            file_path.write_text(value)
-            return True
-        except (PermissionError, FileNotFoundError, OSError) as e:
-            logger.debug(f"Cannot write {file_path}: {e}")
+            fd = self._fds.get(name)
+            if fd is None:
+                fd = os.open(self._led_path / name, os.O_WRONLY)
+                self._fds[name] = fd
+            os.pwrite(fd, data, 0)
+            os.ftruncate(fd, len(data))
+        except OSError as e:
+            self._close_fd(name)
+            logger.debug("Cannot write %s: %s", self._led_path / name, e)
             return False
 
+        if name == "trigger":
+            # Trigger attributes were recreated; drop descriptors to the old ones
+            for attr in [n for n in self._fds if n not in LED_CORE_ATTRIBUTES]:
+                self._close_fd(attr)
+        return True
+
+    def _close_fd(self, name: str) -> None:
+        """Close the kept-open descriptor for an LED control file, if any."""
+        fd = self._fds.pop(name, None)
+        if fd is not None:
+            os.close(fd)
+
+    def close(self) -> None:
+        """Close all kept-open LED control files."""
+        for name in list(self._fds):
+            self._close_fd(name)
+
+    def __del__(self) -> None:
+        self.close()
+
     def set_pattern(self, pattern: LedPattern) -> None:
         """Set the LED pattern.
 
@@ -158,7 +238,7 @@ class SysfsLedController:
             self._write_file("trigger", "heartbeat")
             self._write_file("invert", "0")
 
-        logger.debug(f"LED pattern set to {pattern.value}")
+        logger.debug("LED pattern set to %s", pattern.value)
 
     def get_pattern(self) -> LedPattern:
         """Get current LED pattern."""
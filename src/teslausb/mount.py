@@ -5,8 +5,17 @@ Simple, focused module for mounting disk images via loop devices.
 
 from __future__ import annotations
 
+import ctypes
+import ctypes.util
+import errno
+import fcntl
+import functools
 import logging
+import os
+import select
+import struct
 import subprocess
+import sys
 import tempfile
 import time
 from contextlib import contextmanager
@@ -15,6 +24,33 @@ from typing import Iterator
 
 logger = logging.getLogger(__name__)
 
+# Loop device ioctls (linux/loop.h)
+LOOP_SET_FD = 0x4C00
+LOOP_CLR_FD = 0x4C01
+LOOP_SET_STATUS64 = 0x4C04
+LOOP_CTL_GET_FREE = 0x4C82
+LO_FLAGS_READ_ONLY = 1
+LO_FLAGS_PARTSCAN = 8
+
+# struct loop_info64 is 232 bytes; lo_flags is the __u32 at offset 52
+LOOP_INFO64_SIZE = 232
+LOOP_INFO64_FLAGS_OFFSET = 52
+
+# Attempts to claim a free loop device before giving up (another process
+# may grab the device between LOOP_CTL_GET_FREE and LOOP_SET_FD)
+LOOP_ATTACH_ATTEMPTS = 3
+
+# Disk images are formatted FAT32 by `teslausb init`
+MOUNT_FSTYPE = b"vfat"
+MS_RDONLY = 1
+
+# How long to wait for the partition device node to appear
+PARTITION_TIMEOUT = 1.0
+
+# inotify (linux/inotify.h)
+IN_CREATE = 0x100
+INOTIFY_EVENT = struct.Struct("iIII")
+
 
 class MountError(Exception):
     """Error during mount operations."""
@@ -25,56 +61,326 @@ def _run(cmd: list[str], timeout: int = 30) -> subprocess.CompletedProcess:
 
     Captures output and logs stderr for visibility.
     """
-    logger.debug(f"Running: {' '.join(cmd)}")
+    logger.debug("Running: %s", " ".join(cmd))
     result = subprocess.run(
         cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout, check=False
     )
-    if result.stderr:
-        for line in result.stderr.decode().splitlines():
-            logger.debug(f"{cmd[0]}: {line}")
+    if result.stderr and logger.isEnabledFor(logging.DEBUG):
+        for line in result.stderr.splitlines():
+            logger.debug("%s: %s", cmd[0], line.decode("utf-8", "replace"))
     return result
 
 
-def _setup_loop_device(image_path: Path) -> tuple[str, str] | None:
-    """Create a loop device with partition scanning and wait for partition.
+@functools.cache
+def _get_libc() -> ctypes.CDLL | None:
+    """Resolve libc with mount/umount2 prototypes on first use, or None if unavailable."""
+    if sys.platform != "linux":
+        return None
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return None
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    libc.mount.argtypes = [
+        ctypes.c_char_p,
+        ctypes.c_char_p,
+        ctypes.c_char_p,
+        ctypes.c_ulong,
+        ctypes.c_void_p,
+    ]
+    libc.mount.restype = ctypes.c_int
+    libc.umount2.argtypes = [ctypes.c_char_p, ctypes.c_int]
+    libc.umount2.restype = ctypes.c_int
+    libc.syncfs.argtypes = [ctypes.c_int]
+    libc.syncfs.restype = ctypes.c_int
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_init1.restype = ctypes.c_int
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_add_watch.restype = ctypes.c_int
+    return libc
+
+
+def _attach_loop_device(image_path: Path, readonly: bool) -> str:
+    """Attach a disk image to a free loop device with partition scanning.
+
+    Uses the loop ioctls directly instead of spawning losetup.
 
     Args:
         image_path: Path to disk image file
+        readonly: If True, attach the loop device read-only
 
     Returns:
-        Tuple of (loop_device, partition_device) on success, None on failure
+        Path to the loop device (e.g., /dev/loop0)
+
+    Raises:
+        OSError: If the loop device can't be set up
     """
-    result = _run(["losetup", "-Pf", "--show", str(image_path)])
-    if result.returncode != 0:
+    flags = LO_FLAGS_PARTSCAN | (LO_FLAGS_READ_ONLY if readonly else 0)
+    info = bytearray(LOOP_INFO64_SIZE)
+    struct.pack_into("=I", info, LOOP_INFO64_FLAGS_OFFSET, flags)
+
+    ctl_fd = os.open("/dev/loop-control", os.O_RDWR | os.O_CLOEXEC)
+    try:
+        backing_fd = os.open(image_path, (os.O_RDONLY if readonly else os.O_RDWR) | os.O_CLOEXEC)
+        try:
+            for _ in range(LOOP_ATTACH_ATTEMPTS):
+                loop_dev = f"/dev/loop{fcntl.ioctl(ctl_fd, LOOP_CTL_GET_FREE)}"
+                loop_fd = os.open(loop_dev, os.O_RDWR | os.O_CLOEXEC)
+                try:
+                    try:
+                        fcntl.ioctl(loop_fd, LOOP_SET_FD, backing_fd)
+                    except OSError as e:
+                        if e.errno == errno.EBUSY:
+                            continue
+                        raise
+                    try:
+                        fcntl.ioctl(loop_fd, LOOP_SET_STATUS64, bytes(info))
+                    except OSError:
+                        fcntl.ioctl(loop_fd, LOOP_CLR_FD)
+                        raise
+                    return loop_dev
+                finally:
+                    os.close(loop_fd)
+            raise OSError(errno.EBUSY, "No free loop device")
+        finally:
+            os.close(backing_fd)
+    finally:
+        os.close(ctl_fd)
+
+
+def _watch_dev() -> int | None:
+    """Start watching /dev for new device nodes.
+
+    Returns:
+        inotify file descriptor, or None if inotify isn't available
+    """
+    libc = _get_libc()
+    if libc is None:
         return None
+    fd = int(libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC))
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, b"/dev", IN_CREATE) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _wait_for_partition(partition: str, inotify_fd: int | None) -> bool:
+    """Wait for a partition device node to appear.
+
+    Wakes on inotify events for /dev when available, otherwise polls.
+
+    Args:
+        partition: Partition device path (e.g., /dev/loop0p1)
+        inotify_fd: Descriptor from _watch_dev(), created before the loop
+            device was attached so the creation event can't be missed
+
+    Returns:
+        True if the partition appeared within PARTITION_TIMEOUT
+    """
+    name = os.path.basename(partition).encode()
+    deadline = time.monotonic() + PARTITION_TIMEOUT
+    while not os.path.exists(partition):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if inotify_fd is None:
+            time.sleep(min(0.1, remaining))
+            continue
+        if not select.select([inotify_fd], [], [], remaining)[0]:
+            continue
+        try:
+            buf = os.read(inotify_fd, 4096)
+        except BlockingIOError:
+            continue
+        offset = 0
+        while offset < len(buf):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(buf, offset)
+            offset += INOTIFY_EVENT.size
+            if buf[offset : offset + length].rstrip(b"\0") == name:
+                return True
+            offset += length
+    return True
+
+
+def _setup_loop_device(image_path: Path, readonly: bool = False) -> tuple[str, str] | None:
+    """Create a loop device with partition scanning and wait for partition.
+
+    Falls back to losetup if the loop ioctls aren't usable (e.g., no
+    /dev/loop-control or insufficient permissions).
 
-    loop_dev = result.stdout.decode().strip()
-    partition = f"{loop_dev}p1"
+    Args:
+        image_path: Path to disk image file
+        readonly: If True, attach the loop device read-only
 
-    for _ in range(10):
-        if Path(partition).exists():
+    Returns:
+        Tuple of (loop_device, partition_device) on success, None on failure
+    """
+    inotify_fd = _watch_dev()
+    try:
+        try:
+            loop_dev = _attach_loop_device(image_path, readonly)
+        except OSError as e:
+            logger.debug("Loop ioctl setup failed (%s), falling back to losetup", e)
+            cmd = ["losetup", "-Pf", "--show"]
+            if readonly:
+                cmd.append("-r")
+            result = _run(cmd + [str(image_path)])
+            if result.returncode != 0:
+                return None
+            loop_dev = result.stdout.decode().strip()
+
+        partition = f"{loop_dev}p1"
+        if _wait_for_partition(partition, inotify_fd):
             return loop_dev, partition
-        time.sleep(0.1)
+    finally:
+        if inotify_fd is not None:
+            os.close(inotify_fd)
 
     # Partition didn't appear -- detach loop device before returning
-    _run(["losetup", "-d", loop_dev])
+    _detach_loop_device(loop_dev)
     return None
 
 
 def _detach_loop_device(loop_dev: str) -> None:
     """Detach a loop device."""
+    try:
+        fd = os.open(loop_dev, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            fcntl.ioctl(fd, LOOP_CLR_FD)
+        finally:
+            os.close(fd)
+        return
+    except OSError as e:
+        logger.debug("LOOP_CLR_FD on %s failed (%s), falling back to losetup", loop_dev, e)
+
     result = _run(["losetup", "-d", loop_dev])
     if result.returncode != 0:
         logger.warning("losetup -d failed")
 
 
+def _mount(partition: str, mount_point: Path, readonly: bool) -> bool:
+    """Mount a partition, calling mount(2) directly when possible.
+
+    Falls back to the mount command, which also auto-detects the
+    filesystem type, if the direct call fails.
+
+    Returns:
+        True if mounted
+    """
+    libc = _get_libc()
+    if libc is not None:
+        flags = MS_RDONLY if readonly else 0
+        if libc.mount(partition.encode(), bytes(mount_point), MOUNT_FSTYPE, flags, None) == 0:
+            return True
+        err = ctypes.get_errno()
+        logger.debug(
+            "mount(2) of %s failed (%s), falling back to mount", partition, os.strerror(err)
+        )
+
+    mount_opts = "ro" if readonly else "rw"
+    return _run(["mount", "-o", mount_opts, partition, str(mount_point)]).returncode == 0
+
+
+def _sync_mount(mount_point: Path) -> None:
+    """Flush a mounted filesystem before unmounting.
+
+    Uses syncfs(2) so only this filesystem is written back, not every
+    dirty page on the system (e.g., the SD card root). Falls back to a
+    global sync if syncfs isn't available.
+    """
+    libc = _get_libc()
+    if libc is not None:
+        try:
+            fd = os.open(mount_point, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+        except OSError as e:
+            logger.debug("Cannot open %s for syncfs: %s", mount_point, e)
+        else:
+            try:
+                if libc.syncfs(fd) == 0:
+                    return
+                err = ctypes.get_errno()
+                logger.warning("syncfs() failed with errno %d", err)
+            finally:
+                os.close(fd)
+    os.sync()
+
+
+def _umount(mount_point: Path) -> bool:
+    """Unmount a filesystem, calling umount2(2) directly when possible.
+
+    Returns:
+        True if unmounted
+    """
+    libc = _get_libc()
+    if libc is not None:
+        if libc.umount2(bytes(mount_point), 0) == 0:
+            return True
+        err = ctypes.get_errno()
+        logger.debug(
+            "umount2 of %s failed (%s), falling back to umount", mount_point, os.strerror(err)
+        )
+
+    return _run(["umount", str(mount_point)]).returncode == 0
+
+
+@contextmanager
+def loop_device(image_path: Path, readonly: bool = False) -> Iterator[tuple[str, str]]:
+    """Attach a disk image to a loop device for the duration of the context.
+
+    Lets several operations on the same image (e.g., fsck then mount)
+    share one loop device instead of each setting up and tearing down
+    their own.
+
+    Args:
+        image_path: Path to disk image file
+        readonly: If True, attach the loop device read-only
+
+    Yields:
+        Tuple of (loop_device, partition_device)
+
+    Raises:
+        MountError: If the loop device can't be set up
+    """
+    devices = _setup_loop_device(image_path, readonly=readonly)
+    if not devices:
+        raise MountError(f"Failed to set up loop device for {image_path}")
+
+    try:
+        yield devices
+    finally:
+        _detach_loop_device(devices[0])
+
+
+def _fsck_partition(image_path: Path, partition: str) -> bool:
+    """Run fsck -p on a partition of a disk image.
+
+    Returns:
+        True if fsck succeeded (or made repairs), False on failure
+    """
+    logger.info("Running fsck on %s", image_path)
+    result = _run(["fsck", "-p", partition], timeout=120)
+
+    # fsck exit codes: 0 = clean, 1 = errors corrected, 2+ = errors remain
+    if result.returncode == 0:
+        logger.info("fsck: filesystem clean")
+    elif result.returncode == 1:
+        logger.info("fsck: errors corrected")
+    else:
+        logger.warning("fsck: exited with code %d", result.returncode)
+        return False
+
+    return True
+
+
 def fsck_image(image_path: Path) -> bool:
     """Run filesystem check on a disk image.
 
     Creates a temporary loop device, runs fsck -p on the first partition
     to auto-repair errors, then detaches. This should be run after the USB
     gadget is disabled and before mounting read-write, since the car may
-    have been mid-write when disconnected.
+    have been mid-write when disconnected. To fsck and then mount, use
+    mount_image(..., fsck=True), which shares one loop device for both.
 
     Args:
         image_path: Path to disk image file (e.g., cam_disk.bin)
@@ -82,34 +388,16 @@ def fsck_image(image_path: Path) -> bool:
     Returns:
         True if fsck succeeded (or made repairs), False on failure
     """
-    devices = _setup_loop_device(image_path)
-    if not devices:
+    try:
+        with loop_device(image_path) as (_, partition):
+            return _fsck_partition(image_path, partition)
+    except MountError:
         logger.error("fsck: failed to set up loop device")
         return False
 
-    loop_dev, partition = devices
-
-    try:
-        logger.info(f"Running fsck on {image_path}")
-        result = _run(["fsck", "-p", partition], timeout=120)
-
-        # fsck exit codes: 0 = clean, 1 = errors corrected, 2+ = errors remain
-        if result.returncode == 0:
-            logger.info("fsck: filesystem clean")
-        elif result.returncode == 1:
-            logger.info("fsck: errors corrected")
-        else:
-            logger.warning(f"fsck: exited with code {result.returncode}")
-            return False
-
-        return True
-
-    finally:
-        _detach_loop_device(loop_dev)
-
 
 @contextmanager
-def mount_image(image_path: Path, readonly: bool = True) -> Iterator[Path]:
+def mount_image(image_path: Path, readonly: bool = True, fsck: bool = False) -> Iterator[Path]:
     """Mount a disk image and yield the mount path.
 
     Creates a loop device with partition scanning, mounts the first partition,
@@ -118,6 +406,9 @@ def mount_image(image_path: Path, readonly: bool = True) -> Iterator[Path]:
     Args:
         image_path: Path to disk image file (e.g., snap.bin or cam_disk.bin)
         readonly: If True, mount read-only (default). If False, mount read-write.
+        fsck: If True, run fsck -p on the partition before mounting, using
+            the same loop device. Needs readonly=False to make repairs. A
+            failed fsck is logged and the mount proceeds anyway.
 
     Yields:
         Path to mounted filesystem
@@ -130,40 +421,34 @@ def mount_image(image_path: Path, readonly: bool = True) -> Iterator[Path]:
             for f in (mnt / "TeslaCam" / "SavedClips").iterdir():
                 print(f)
 
-        # Mount read-write for deletion:
-        with mount_image(Path("/backingfiles/cam_disk.bin"), readonly=False) as mnt:
+        # Repair and mount read-write for deletion:
+        with mount_image(Path("/backingfiles/cam_disk.bin"), readonly=False, fsck=True) as mnt:
             (mnt / "TeslaCam" / "SavedClips" / "old_event").unlink()
     """
-    devices = _setup_loop_device(image_path)
-    if not devices:
-        raise MountError(f"Failed to set up loop device for {image_path}")
-
-    loop_dev, partition = devices
-    mount_point: Path | None = None
-
-    try:
-        mount_point = Path(tempfile.mkdtemp(prefix="teslausb-mount-"))
-
-        mount_opts = "ro" if readonly else "rw"
-        result = _run(["mount", "-o", mount_opts, partition, str(mount_point)])
-        if result.returncode != 0:
-            raise MountError("mount failed")
-
-        mode = "read-only" if readonly else "read-write"
-        logger.info(f"Mounted {image_path} at {mount_point} ({mode})")
-        yield mount_point
-
-    finally:
-        if mount_point and mount_point.exists():
-            if not readonly:
-                _run(["sync"])
-            result = _run(["umount", str(mount_point)])
-            if result.returncode != 0:
-                logger.warning("umount failed")
-            try:
-                mount_point.rmdir()
-            except OSError:
-                pass
-
-        _detach_loop_device(loop_dev)
-        logger.debug(f"Cleaned up mount for {image_path}")
+    with loop_device(image_path, readonly=readonly) as (_, partition):
+        if fsck and not _fsck_partition(image_path, partition):
+            logger.warning("fsck failed, proceeding with mount anyway")
+
+        mount_point: Path | None = None
+        try:
+            mount_point = Path(tempfile.mkdtemp(prefix="teslausb-mount-"))
+
+            if not _mount(partition, mount_point, readonly):
+                raise MountError("mount failed")
+
+            mode = "read-only" if readonly else "read-write"
+            logger.info("Mounted %s at %s (%s)", image_path, mount_point, mode)
+            yield mount_point
+
+        finally:
+            if mount_point and mount_point.exists():
+                if not readonly:
+                    _sync_mount(mount_point)
+                if not _umount(mount_point):
+                    logger.warning("umount failed")
+                try:
+                    mount_point.rmdir()
+                except OSError:
+                    pass
+
+    logger.debug("Cleaned up mount for %s", image_path)
@@ -18,17 +18,25 @@ from __future__ import annotations
 import json
 import logging
 import threading
-from contextlib import contextmanager
+from contextlib import contextmanager, suppress
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
 from typing import Iterator
 
-from .filesystem import Filesystem
+from .filesystem import FileNotFoundError_, Filesystem, FilesystemError
 
 logger = logging.getLogger(__name__)
 
+# Snapshot directories are named SNAPSHOT_PREFIX + zero-padded id
+SNAPSHOT_PREFIX = "snap-"
+
+# Files a snapshot directory holds, in removal order (.toc first, so a crash
+# mid-removal leaves an incomplete snapshot that's cleaned up on restart)
+SNAPSHOT_FILES = ("snap.toc", "snap.bin", "metadata.json")
+
 
 class SnapshotState(Enum):
     """State of a snapshot in its lifecycle.
@@ -74,17 +82,17 @@ class Snapshot:
     created_at: datetime
     refcount: int = 0
 
-    @property
+    @cached_property
     def image_path(self) -> Path:
         """Path to the snapshot image file."""
         return self.path / "snap.bin"
 
-    @property
+    @cached_property
     def toc_path(self) -> Path:
         """Path to the table of contents file (marks snapshot as complete)."""
         return self.path / "snap.toc"
 
-    @property
+    @cached_property
     def metadata_path(self) -> Path:
         """Path to the metadata JSON file."""
         return self.path / "metadata.json"
@@ -192,15 +200,18 @@ class SnapshotManager:
     cam_disk_path: Path
     snapshots_path: Path
 
-    # Internal state
+    # Internal state. _snapshots is kept in creation order (oldest first).
     _snapshots: dict[int, Snapshot] = field(default_factory=dict)
     _next_id: int = 0
-    _lock: threading.RLock = field(default_factory=threading.RLock)
-    _creating: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    # Snapshots directory mtime as of the last load or refresh()
+    _dir_mtime: int | None = None
+    # Held for the duration of create_snapshot; only one creation at a time
+    _create_lock: threading.Lock = field(default_factory=threading.Lock)
 
     def __post_init__(self) -> None:
         """Initialize manager and load existing snapshots."""
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
         self._load_snapshots()
 
     def _load_snapshots(self) -> None:
@@ -213,16 +224,19 @@ class SnapshotManager:
             self.fs.mkdir(self.snapshots_path, parents=True, exist_ok=True)
             return
 
-        for name in self.fs.listdir(self.snapshots_path):
-            if not name.startswith("snap-"):
+        # Taken before the scan, so anything changed during it is picked up
+        # by the next refresh()
+        self._dir_mtime = self.fs.stat(self.snapshots_path).mtime_ns
+
+        for entry in self.fs.scandir(self.snapshots_path):
+            name = entry.name
+            if not name.startswith(SNAPSHOT_PREFIX) or not entry.is_dir:
                 continue
 
             snap_path = self.snapshots_path / name
-            if not self.fs.is_dir(snap_path):
-                continue
 
             try:
-                snap_id = int(name.replace("snap-", ""))
+                snap_id = int(name[len(SNAPSHOT_PREFIX):])
             except ValueError:
                 logger.warning(f"Invalid snapshot directory name: {name}")
                 continue
@@ -235,26 +249,94 @@ class SnapshotManager:
                 self._remove_snapshot_dir(snap_path)
                 continue
 
-            # Load snapshot metadata
-            metadata_path = snap_path / "metadata.json"
-            if self.fs.exists(metadata_path):
-                try:
-                    data = json.loads(self.fs.read_text(metadata_path))
-                    snapshot = Snapshot.from_dict(data)
-                except (json.JSONDecodeError, KeyError) as e:
-                    logger.warning(f"Failed to load snapshot metadata {metadata_path}: {e}")
-                    # Metadata corrupted but .toc exists - reconstruct from filesystem
-                    snapshot = self._reconstruct_snapshot(snap_id, snap_path)
-            else:
-                # No metadata but .toc exists - reconstruct from filesystem
-                snapshot = self._reconstruct_snapshot(snap_id, snap_path)
-                self._save_metadata(snapshot)
-
-            self._snapshots[snap_id] = snapshot
+            self._snapshots[snap_id] = self._read_snapshot(snap_id, snap_path)
             self._next_id = max(self._next_id, snap_id + 1)
 
+        self._sort_snapshots()
         logger.info(f"Loaded {len(self._snapshots)} existing snapshots")
 
+    def _read_snapshot(self, snap_id: int, snap_path: Path) -> Snapshot:
+        """Read a complete snapshot's metadata, reconstructing it if needed."""
+        metadata_path = snap_path / "metadata.json"
+        try:
+            data = json.loads(self.fs.read_text(metadata_path))
+            return Snapshot.from_dict(data)
+        except FileNotFoundError_:
+            # No metadata but .toc exists - reconstruct from filesystem
+            snapshot = self._reconstruct_snapshot(snap_id, snap_path)
+            self._save_metadata(snapshot)
+            return snapshot
+        except (json.JSONDecodeError, KeyError) as e:
+            logger.warning(f"Failed to load snapshot metadata {metadata_path}: {e}")
+            # Metadata corrupted but .toc exists - reconstruct from filesystem
+            return self._reconstruct_snapshot(snap_id, snap_path)
+
+    def refresh(self) -> None:
+        """Pick up snapshots added or removed outside this manager.
+
+        For example, by `teslausb clean` running while the service is up.
+        When nothing changed this is a single stat() of the snapshots
+        directory, compared with its mtime at the last load or refresh.
+        Otherwise directory names are compared and metadata is only read
+        for new snapshots. Incomplete directories are left alone, since
+        they may still be being created; startup cleans them up.
+        """
+        try:
+            mtime = self.fs.stat(self.snapshots_path).mtime_ns
+        except FilesystemError as e:
+            logger.warning(f"Failed to refresh snapshots: {e}")
+            return
+        if mtime == self._dir_mtime:
+            return
+
+        # Scan under the lock: a snapshot this manager publishes between the
+        # scan and the diff would otherwise look like it was removed externally
+        with self._lock:
+            on_disk: dict[int, Path] = {}
+            try:
+                for entry in self.fs.scandir(self.snapshots_path):
+                    if entry.is_dir and entry.name.startswith(SNAPSHOT_PREFIX):
+                        try:
+                            snap_id = int(entry.name[len(SNAPSHOT_PREFIX):])
+                            on_disk[snap_id] = self.snapshots_path / entry.name
+                        except ValueError:
+                            continue
+            except FilesystemError as e:
+                logger.warning(f"Failed to refresh snapshots: {e}")
+                return
+
+            for snapshot in list(self._snapshots.values()):
+                if snapshot.id not in on_disk and snapshot.is_deletable:
+                    logger.info(f"Snapshot {snapshot.id} was removed externally")
+                    del self._snapshots[snapshot.id]
+            new_ids = on_disk.keys() - self._snapshots.keys()
+
+        added = []
+        for snap_id in new_ids:
+            snap_path = on_disk[snap_id]
+            if self.fs.exists(snap_path / "snap.toc"):
+                added.append(self._read_snapshot(snap_id, snap_path))
+
+        with self._lock:
+            for snapshot in added:
+                if snapshot.id not in self._snapshots:
+                    logger.info(f"Found new snapshot {snapshot.id}")
+                    self._snapshots[snapshot.id] = snapshot
+                    self._next_id = max(self._next_id, snapshot.id + 1)
+            if added:
+                self._sort_snapshots()
+            self._dir_mtime = mtime
+
+    def _sort_snapshots(self) -> None:
+        """Order loaded snapshots by creation time.
+
+        New snapshots are appended as they're created, so this only needs
+        to run once after loading.
+        """
+        self._snapshots = dict(
+            sorted(self._snapshots.items(), key=lambda item: item[1].created_at)
+        )
+
     def _reconstruct_snapshot(self, snap_id: int, snap_path: Path) -> Snapshot:
         """Reconstruct snapshot metadata from filesystem."""
         image_path = snap_path / "snap.bin"
@@ -272,27 +354,38 @@ class SnapshotManager:
         )
 
     def _remove_snapshot_dir(self, snap_path: Path) -> None:
-        """Remove a snapshot directory."""
+        """Remove a snapshot directory.
+
+        The known snapshot files are removed by name, so no directory scan
+        is needed. rmtree is only used if anything else was left behind.
+        """
         try:
-            if self.fs.exists(snap_path):
+            for name in SNAPSHOT_FILES:
+                with suppress(FileNotFoundError_):
+                    self.fs.remove(snap_path / name)
+            try:
+                self.fs.rmdir(snap_path)
+            except FileNotFoundError_:
+                return
+            except FilesystemError:
                 self.fs.rmtree(snap_path)
-                logger.info(f"Removed snapshot at {snap_path}")
+            logger.info(f"Removed snapshot at {snap_path}")
         except Exception as e:
             logger.error(f"Failed to remove {snap_path}: {e}")
 
     def _save_metadata(self, snapshot: Snapshot) -> None:
-        """Save snapshot metadata to disk."""
+        """Save snapshot metadata to disk.
+
+        Written compact: without indent, json uses its C encoder.
+        """
         try:
-            self.fs.write_text(
-                snapshot.metadata_path,
-                json.dumps(snapshot.to_dict(), indent=2)
-            )
+            self.fs.write_text(snapshot.metadata_path, json.dumps(snapshot.to_dict()))
         except Exception as e:
             logger.warning(f"Failed to save snapshot metadata: {e}")
 
     def _snap_dir_name(self, snap_id: int) -> str:
         """Generate snapshot directory name."""
-        return f"snap-{snap_id:06d}"
+        return f"{SNAPSHOT_PREFIX}{snap_id:06d}"
 
     def create_snapshot(self) -> Snapshot:
         """Create a new COW snapshot of the camera disk.
@@ -303,10 +396,8 @@ class SnapshotManager:
         Raises:
             SnapshotCreationError: If creation fails
         """
-        with self._lock:
-            if self._creating:
-                raise SnapshotCreationError("Snapshot creation already in progress")
-            self._creating = True
+        if not self._create_lock.acquire(blocking=False):
+            raise SnapshotCreationError("Snapshot creation already in progress")
 
         try:
             snap_id = self._next_id
@@ -349,8 +440,7 @@ class SnapshotManager:
             return snapshot
 
         finally:
-            with self._lock:
-                self._creating = False
+            self._create_lock.release()
 
     def acquire(self, snapshot_id: int) -> SnapshotHandle:
         """Acquire a reference to a snapshot.
@@ -373,36 +463,43 @@ class SnapshotManager:
 
             snapshot = self._snapshots[snapshot_id]
             snapshot.refcount += 1
+            refcount = snapshot.refcount
 
-            logger.debug(f"Acquired snapshot {snapshot_id}, refcount={snapshot.refcount}")
-            return SnapshotHandle(snapshot, self)
+        logger.debug("Acquired snapshot %d, refcount=%d", snapshot_id, refcount)
+        return SnapshotHandle(snapshot, self)
 
     def _release_handle(self, handle: SnapshotHandle) -> None:
         """Release a snapshot handle (called by SnapshotHandle)."""
+        snapshot = handle._snapshot
         with self._lock:
-            snapshot = handle._snapshot
-
-            if snapshot.id not in self._snapshots:
-                logger.warning(f"Releasing handle for deleted snapshot {snapshot.id}")
-                return
+            tracked = snapshot.id in self._snapshots
+            if tracked:
+                snapshot.refcount = max(0, snapshot.refcount - 1)
+                refcount = snapshot.refcount
 
-            snapshot.refcount = max(0, snapshot.refcount - 1)
-            logger.debug(f"Released snapshot {snapshot.id}, refcount={snapshot.refcount}")
+        if not tracked:
+            logger.warning(f"Releasing handle for deleted snapshot {snapshot.id}")
+            return
+        logger.debug("Released snapshot %d, refcount=%d", snapshot.id, refcount)
 
     def get_snapshot(self, snapshot_id: int) -> Snapshot | None:
-        """Get a snapshot by ID."""
-        with self._lock:
-            return self._snapshots.get(snapshot_id)
+        """Get a snapshot by ID.
+
+        A single dict lookup is atomic, so no lock is taken. The returned
+        snapshot's refcount is only a point-in-time value; use acquire()
+        to keep it from being deleted.
+        """
+        return self._snapshots.get(snapshot_id)
 
     def get_snapshots(self) -> list[Snapshot]:
         """Get all snapshots, ordered by creation time (oldest first)."""
         with self._lock:
-            return sorted(self._snapshots.values(), key=lambda s: s.created_at)
+            return list(self._snapshots.values())
 
     def get_deletable_snapshots(self) -> list[Snapshot]:
         """Get snapshots that can be deleted (refcount == 0)."""
         with self._lock:
-            return [s for s in self.get_snapshots() if s.is_deletable]
+            return [s for s in self._snapshots.values() if s.is_deletable]
 
     def delete_snapshot(self, snapshot_id: int) -> bool:
         """Delete a snapshot if it's not in use.
@@ -438,15 +535,8 @@ class SnapshotManager:
         # Perform deletion outside lock
         logger.info(f"Deleting snapshot {snapshot_id}")
 
-        # Delete .toc first - this marks snapshot as incomplete
-        # If we crash after this, cleanup will remove the rest on restart
-        try:
-            if self.fs.exists(snapshot.toc_path):
-                self.fs.remove(snapshot.toc_path)
-        except Exception as e:
-            logger.warning(f"Failed to remove .toc file: {e}")
-
-        # Now delete the rest
+        # Removes .toc first - this marks snapshot as incomplete
+        # If we crash after that, cleanup will remove the rest on restart
         self._remove_snapshot_dir(snapshot.path)
 
         logger.info(f"Snapshot {snapshot_id} deleted")
@@ -458,11 +548,11 @@ class SnapshotManager:
         Returns:
             True if a snapshot was deleted, False otherwise
         """
-        deletable = self.get_deletable_snapshots()
-        if not deletable:
+        with self._lock:
+            oldest = next((s for s in self._snapshots.values() if s.is_deletable), None)
+        if oldest is None:
             return False
 
-        oldest = deletable[0]
         try:
             return self.delete_snapshot(oldest.id)
         except SnapshotInUseError:
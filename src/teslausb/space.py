@@ -15,6 +15,7 @@ Space model:
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -22,10 +23,12 @@ from .filesystem import Filesystem
 
 # Constants
 GB = 1024 * 1024 * 1024
-SECTOR_SIZE = 512  # Disk sector size for alignment
-XFS_OVERHEAD_PROPORTION = 0.03  # 3% reserved for XFS metadata (measured ~2% in practice)
+SECTOR_SIZE = 512  # Disk sector size for alignment (must be a power of two)
+XFS_OVERHEAD_PERCENT = 3  # Reserved for XFS metadata (measured ~2% in practice)
+XFS_OVERHEAD_PROPORTION = XFS_OVERHEAD_PERCENT / 100
 MIN_CAM_SIZE = 1 * GB  # Minimum useful cam disk size
 DEFAULT_RESERVE = 10 * GB  # Default space to reserve for OS
+SPACE_INFO_TTL = 0.1  # Seconds a statvfs() result is reused for
 
 
 def calculate_cam_size(backingfiles_size: int) -> int:
@@ -49,11 +52,12 @@ def calculate_cam_size(backingfiles_size: int) -> int:
     Returns:
         Recommended cam_size in bytes (sector-aligned)
     """
-    xfs_overhead = int(backingfiles_size * XFS_OVERHEAD_PROPORTION)
+    # Integer math throughout, so huge sizes aren't subject to float rounding
+    xfs_overhead = backingfiles_size * XFS_OVERHEAD_PERCENT // 100
     usable = backingfiles_size - xfs_overhead
     cam_size = usable // 2
     # Align down to sector boundary to prevent losetup truncation issues
-    return max(0, (cam_size // SECTOR_SIZE) * SECTOR_SIZE)
+    return max(0, cam_size & ~(SECTOR_SIZE - 1))
 
 
 @dataclass
@@ -62,7 +66,10 @@ class SpaceInfo:
 
     total_bytes: int
     free_bytes: int
-    used_bytes: int
+
+    @property
+    def used_bytes(self) -> int:
+        return self.total_bytes - self.free_bytes
 
     @property
     def total_gb(self) -> float:
@@ -96,17 +103,29 @@ class SpaceManager:
         """
         self.fs = fs
         self.backingfiles_path = backingfiles_path
+        # (monotonic time, result) of the last statvfs(), for bursty callers
+        self._cached: tuple[float, SpaceInfo] | None = None
+
+    def invalidate(self) -> None:
+        """Drop the cached space info, e.g. after a snapshot is deleted."""
+        self._cached = None
 
     def get_space_info(self) -> SpaceInfo:
-        """Get current space information."""
-        statvfs = self.fs.statvfs(self.backingfiles_path)
+        """Get current space information.
 
-        total = statvfs.total_bytes
-        free = statvfs.available_bytes
-        used = total - free
+        statvfs() flushes the journal first, so results are reused for
+        SPACE_INFO_TTL seconds or until invalidate() is called.
+        """
+        cached = self._cached
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < SPACE_INFO_TTL:
+            return cached[1]
+
+        statvfs = self.fs.statvfs(self.backingfiles_path)
 
-        return SpaceInfo(
-            total_bytes=total,
-            free_bytes=free,
-            used_bytes=used,
+        info = SpaceInfo(
+            total_bytes=statvfs.total_bytes,
+            free_bytes=statvfs.available_bytes,
         )
+        self._cached = (now, info)
+        return info
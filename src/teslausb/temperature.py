@@ -13,6 +13,7 @@ Features:
 from __future__ import annotations
 
 import logging
+import os
 import threading
 import time
 from dataclasses import dataclass, field
@@ -28,13 +29,22 @@ THERMAL_ZONE_PATH = Path("/sys/class/thermal/thermal_zone0/temp")
 # Hysteresis to prevent alert flapping (5°C)
 HYSTERESIS_MILLIDEGREES = 5000
 
+# Enough for any millidegree value plus trailing newline
+THERMAL_READ_SIZE = 16
+
 
 @dataclass
 class TemperatureReading:
     """A temperature reading."""
 
     millidegrees: int
-    timestamp: datetime = field(default_factory=datetime.now)
+    # Unix time of the reading; the datetime is only built if asked for
+    unix_time: float = field(default_factory=time.time)
+
+    @property
+    def timestamp(self) -> datetime:
+        """When the reading was taken, as a local datetime."""
+        return datetime.fromtimestamp(self.unix_time)
 
     @property
     def celsius(self) -> float:
@@ -126,6 +136,7 @@ class SysfsTemperatureMonitor:
         self._running = False
         self._thread: threading.Thread | None = None
         self._stop_event = threading.Event()
+        self._fd: int | None = None
 
     def is_available(self) -> bool:
         """Check if temperature monitoring is available."""
@@ -134,17 +145,31 @@ class SysfsTemperatureMonitor:
     def get_temperature(self) -> TemperatureReading | None:
         """Get current temperature reading.
 
+        The thermal zone file is opened on first use and kept open; sysfs
+        regenerates its contents on every read from offset 0.
+
         Returns:
             TemperatureReading, or None if unavailable
         """
         try:
-            content = self.thermal_path.read_text().strip()
-            millidegrees = int(content)
+            if self._fd is None:
+                self._fd = os.open(self.thermal_path, os.O_RDONLY)
+            millidegrees = int(os.pread(self._fd, THERMAL_READ_SIZE, 0))
             return TemperatureReading(millidegrees=millidegrees)
-        except (FileNotFoundError, PermissionError, ValueError) as e:
+        except (OSError, ValueError) as e:
             logger.debug(f"Cannot read temperature: {e}")
+            self.close()
             return None
 
+    def close(self) -> None:
+        """Close the kept-open thermal zone file, if any."""
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            os.close(fd)
+
+    def __del__(self) -> None:
+        self.close()
+
     def get_status(self) -> TemperatureStatus:
         """Get current monitoring status."""
         return TemperatureStatus(
@@ -248,6 +273,7 @@ class SysfsTemperatureMonitor:
         if self._thread:
             self._thread.join(timeout=5)
         self._running = False
+        self.close()
 
     def reset_peak(self) -> None:
         """Reset peak temperature tracking."""
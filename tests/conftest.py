@@ -11,6 +11,12 @@ from teslausb.filesystem import MockFilesystem
 from teslausb.snapshot import SnapshotManager
 from teslausb.space import GB, SpaceManager
 
+# Fake clip payloads, built once. bytes are immutable, so every
+# mock_fs_with_teslacam can share them instead of allocating ~2 MB per test.
+_PAYLOAD_300K = b"x" * 300_000
+_PAYLOAD_500K = b"x" * 500_000
+_PAYLOAD_600K = b"x" * 600_000
+
 
 @pytest.fixture
 def mock_fs() -> MockFilesystem:
@@ -81,16 +87,16 @@ def mock_fs_with_teslacam(mock_fs: MockFilesystem) -> MockFilesystem:
     # Create some event folders with video files
     event1 = base / "SavedClips" / "2024-01-15_10-30-00"
     fs.mkdir(event1, parents=True)
-    fs.write_bytes(event1 / "2024-01-15_10-30-00-front.mp4", b"x" * 500_000)
-    fs.write_bytes(event1 / "2024-01-15_10-30-00-back.mp4", b"x" * 500_000)
+    fs.write_bytes(event1 / "2024-01-15_10-30-00-front.mp4", _PAYLOAD_500K)
+    fs.write_bytes(event1 / "2024-01-15_10-30-00-back.mp4", _PAYLOAD_500K)
 
     event2 = base / "SentryClips" / "2024-01-15_11-00-00"
     fs.mkdir(event2, parents=True)
-    fs.write_bytes(event2 / "2024-01-15_11-00-00-front.mp4", b"x" * 600_000)
+    fs.write_bytes(event2 / "2024-01-15_11-00-00-front.mp4", _PAYLOAD_600K)
 
     # Create Photobooth structure
     photobooth = base / "Photobooth"
     fs.mkdir(photobooth, parents=True)
-    fs.write_bytes(photobooth / "selfie_2025-01-01.png", b"x" * 300_000)
+    fs.write_bytes(photobooth / "selfie_2025-01-01.png", _PAYLOAD_300K)
 
     return fs
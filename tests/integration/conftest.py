@@ -8,14 +8,34 @@ Run with: docker compose -f docker-compose.test.yml up --build
 
 from __future__ import annotations
 
+import contextlib
+import ctypes
+import ctypes.util
+import fcntl
+import functools
+import os
+import select
+import shutil
 import subprocess
+import tempfile
 import time
+from collections.abc import Generator, Iterator
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Generator
 
 import pytest
 
+from teslausb.snapshot import SNAPSHOT_PREFIX
+
+# ioctl(dst_fd, FICLONE, src_fd) shares all of src's extents with dst
+FICLONE = 0x40049409
+
+# inotify_add_watch() mask for entries created in the watched directory
+IN_CREATE = 0x100
+
+# How long to wait for the loop partition node before falling back to kpartx
+PARTITION_TIMEOUT = 1.0
+
 
 @dataclass
 class IntegrationTestEnv:
@@ -41,19 +61,26 @@ class IntegrationTestEnv:
 
 def _cleanup_loop_devices(path_pattern: str | None = None) -> None:
     """Clean up loop devices, optionally filtering by path pattern."""
-    # First, remove any kpartx mappings
     result = subprocess.run(["losetup", "-a"], capture_output=True, text=True)
-    for line in result.stdout.splitlines():
-        if ":" not in line:
-            continue
-        loop_dev = line.split(":")[0]
-        if path_pattern is None or path_pattern in line:
-            # Remove kpartx mappings first
+    targets = [
+        line.split(":")[0]
+        for line in result.stdout.splitlines()
+        if ":" in line and (path_pattern is None or path_pattern in line)
+    ]
+
+    # Remove kpartx mappings first, only for loops that actually have them
+    dm_path = Path("/dev/mapper")
+    for loop_dev in targets:
+        if any(dm_path.glob(f"{Path(loop_dev).name}p*")):
             subprocess.run(["kpartx", "-d", loop_dev], capture_output=True)
-            subprocess.run(["losetup", "-d", loop_dev], capture_output=True)
+
+    # Detach in one losetup call rather than one per device
+    if path_pattern is None:
+        subprocess.run(["losetup", "-D"], capture_output=True)
+    elif targets:
+        subprocess.run(["losetup", "-d", *targets], capture_output=True)
 
     # Also clean up any stale device mapper entries
-    dm_path = Path("/dev/mapper")
     if dm_path.exists():
         for entry in dm_path.iterdir():
             if entry.name.startswith("loop"):
@@ -62,11 +89,7 @@ def _cleanup_loop_devices(path_pattern: str | None = None) -> None:
 
 def _is_mounted(path: Path) -> bool:
     """Check if path is a mount point."""
-    result = subprocess.run(
-        ["mountpoint", "-q", str(path)],
-        capture_output=True,
-    )
-    return result.returncode == 0
+    return os.path.ismount(path)
 
 
 def _cleanup_mounts_and_devices(env: IntegrationTestEnv) -> None:
@@ -87,6 +110,39 @@ def _cleanup_mounts_and_devices(env: IntegrationTestEnv) -> None:
     time.sleep(0.2)
 
 
+def _watch_dev() -> int:
+    """Start watching /dev for new device nodes.
+
+    Returns:
+        inotify file descriptor
+    """
+    fd = int(_libc().inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC))
+    if fd < 0 or _libc().inotify_add_watch(fd, b"/dev", IN_CREATE) < 0:
+        err = ctypes.get_errno()
+        if fd >= 0:
+            os.close(fd)
+        raise OSError(err, f"Failed to watch /dev: {os.strerror(err)}")
+    return fd
+
+
+def _wait_for_node(path: Path, inotify_fd: int, timeout: float) -> bool:
+    """Wait for a device node to appear, waking on each inotify event.
+
+    Returns:
+        True if the node appeared within timeout
+    """
+    deadline = time.monotonic() + timeout
+    while not path.exists():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if select.select([inotify_fd], [], [], remaining)[0]:
+            # Drain the events; the loop re-checks the path either way
+            with contextlib.suppress(BlockingIOError):
+                os.read(inotify_fd, 4096)
+    return True
+
+
 def mount_cam_disk(disk_path: Path, mount_point: Path) -> tuple[str, str, bool]:
     """Mount a cam disk image, handling Docker kpartx fallback.
 
@@ -113,19 +169,21 @@ def mount_cam_disk(disk_path: Path, mount_point: Path) -> tuple[str, str, bool]:
     )
     loop_dev = result.stdout.strip()
     if result.returncode != 0 or not loop_dev:
-        error_msg = result.stderr.strip() if result.stderr else "losetup failed with no error message"
+        error_msg = (
+            result.stderr.strip() if result.stderr else "losetup failed with no error message"
+        )
         raise RuntimeError(f"Failed to set up loop device for {disk_path}: {error_msg}")
     partition = f"{loop_dev}p1"
     kpartx_used = False
 
-    # Try to get kernel to recognize partition table
-    subprocess.run(["blockdev", "--rereadpt", loop_dev], capture_output=True)
-
-    # Wait for partition device to appear
-    for _ in range(20):
-        if Path(partition).exists():
-            break
-        time.sleep(0.1)
+    # Watch /dev before the rescan, so the partition's creation can't be missed
+    inotify_fd = _watch_dev()
+    try:
+        # Try to get kernel to recognize partition table
+        subprocess.run(["blockdev", "--rereadpt", loop_dev], capture_output=True)
+        _wait_for_node(Path(partition), inotify_fd, PARTITION_TIMEOUT)
+    finally:
+        os.close(inotify_fd)
 
     # If partition not found, use kpartx (needed in Docker Desktop)
     if not Path(partition).exists():
@@ -143,14 +201,83 @@ def mount_cam_disk(disk_path: Path, mount_point: Path) -> tuple[str, str, bool]:
     return loop_dev, partition, kpartx_used
 
 
+@functools.cache
+def _libc() -> ctypes.CDLL:
+    """Load libc for the direct syscalls below."""
+    return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+
+def _umount2(mount_point: Path) -> bool:
+    """Unmount a filesystem with umount2(2) rather than spawning umount.
+
+    Returns:
+        True if unmounted
+    """
+    return _libc().umount2(bytes(mount_point), 0) == 0
+
+
+def unmount(mount_point: Path) -> None:
+    """Unmount a filesystem.
+
+    Raises:
+        RuntimeError: If the filesystem could not be unmounted
+    """
+    if not _umount2(mount_point):
+        err = ctypes.get_errno()
+        raise RuntimeError(f"Failed to unmount {mount_point}: {os.strerror(err)}")
+
+
 def unmount_cam_disk(mount_point: Path, loop_dev: str, kpartx_used: bool) -> None:
     """Unmount a cam disk and clean up loop devices."""
-    subprocess.run(["umount", str(mount_point)], check=False)
+    _umount2(mount_point)
     if kpartx_used:
         subprocess.run(["kpartx", "-d", loop_dev], check=False)
     subprocess.run(["losetup", "-d", loop_dev], check=False)
 
 
+def _first_partition_offset(entry: bytes) -> int:
+    """Byte offset of the partition described by an MBR partition entry."""
+    return int.from_bytes(entry[8:12], "little") * 512
+
+
+def probe_first_partition(disk_path: Path) -> tuple[int, str]:
+    """Read the first MBR partition's type and filesystem label from a disk image.
+
+    Returns:
+        Tuple of (MBR partition type byte, boot sector filesystem type,
+        e.g. "FAT32")
+    """
+    with open(disk_path, "rb") as f:
+        entry = f.read(512)[0x1BE:0x1CE]
+        f.seek(_first_partition_offset(entry))
+        boot_sector = f.read(512)
+    # FAT32 boot sectors carry the filesystem type string at 0x52
+    return entry[4], boot_sector[0x52:0x5A].decode("ascii", "replace").strip()
+
+
+def iter_snapshots(env: IntegrationTestEnv) -> Iterator[os.DirEntry]:
+    """Yield the directory entries of env's snapshot directories."""
+    with os.scandir(env.snapshots_path) as it:
+        for entry in it:
+            if entry.name.startswith(SNAPSHOT_PREFIX):
+                yield entry
+
+
+def list_snapshots(env: IntegrationTestEnv) -> list[Path]:
+    """List the snapshot directories in env."""
+    return [Path(entry.path) for entry in iter_snapshots(env)]
+
+
+def reflink_copy(src: Path, dst: Path) -> None:
+    """Clone src to dst with the FICLONE ioctl.
+
+    Unlike cp --reflink, there is no data-copy path here: the kernel either
+    shares the extents or raises OSError (EOPNOTSUPP, EXDEV, ...).
+    """
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
 def create_test_footage(cam_mount: Path, event_name: str = "2024-01-15_10-30-00") -> None:
     """Create test TeslaCam footage structure."""
     saved = cam_mount / "TeslaCam" / "SavedClips"
@@ -169,21 +296,56 @@ def create_test_footage(cam_mount: Path, event_name: str = "2024-01-15_10-30-00"
     event_json.write_text('{"timestamp": "2024-01-15T10:30:00"}')
 
 
-@pytest.fixture
-def test_env(tmp_path: Path) -> Generator[IntegrationTestEnv, None, None]:
-    """Create an isolated test environment.
+def write_test_footage(
+    env: IntegrationTestEnv, event_name: str = "2024-01-15_10-30-00"
+) -> None:
+    """Write test footage into env's cam disk image, leaving it unmounted.
 
-    Creates a temporary directory structure for testing:
-    - {tmp}/mutable/       - Where backingfiles.img is created
-    - {tmp}/backingfiles/  - Mount point for backingfiles.img
-    - {tmp}/config         - Config file
+    Uses mtools to write straight into the FAT32 partition when it is
+    installed, which needs no loop device or mount. Otherwise mounts the
+    disk, writes the footage and unmounts it again.
     """
-    # Clean up any leftover devices from previous test runs
-    _cleanup_loop_devices()
+    disk_path = env.cam_disk_path
+    if shutil.which("mcopy") is None:
+        mount_point = env.root / "cam_mount"
+        mount_point.mkdir(exist_ok=True)
+        loop_dev, _, kpartx_used = mount_cam_disk(disk_path, mount_point)
+        try:
+            create_test_footage(mount_point, event_name)
+        finally:
+            unmount_cam_disk(mount_point, loop_dev, kpartx_used)
+        return
+
+    with open(disk_path, "rb") as f:
+        offset = _first_partition_offset(f.read(512)[0x1BE:0x1CE])
+    image = f"{disk_path}@@{offset}"
+    mtools_env = {**os.environ, "MTOOLS_SKIP_CHECK": "1"}
+
+    with tempfile.TemporaryDirectory() as staging:
+        create_test_footage(Path(staging), event_name)
+        event_dir = Path(staging) / "TeslaCam" / "SavedClips" / event_name
+        dest = f"::/TeslaCam/SavedClips/{event_name}"
+        # -D s skips directories left by an earlier call
+        for d in ("::/TeslaCam", "::/TeslaCam/SavedClips", dest):
+            subprocess.run(["mmd", "-D", "s", "-i", image, d], env=mtools_env, check=True)
+        subprocess.run(
+            ["mcopy", "-o", "-i", image, *sorted(map(str, event_dir.iterdir())), dest + "/"],
+            env=mtools_env,
+            check=True,
+        )
+
 
-    mutable_path = tmp_path / "mutable"
-    backingfiles_path = tmp_path / "backingfiles"
-    config_path = tmp_path / "teslausb.conf"
+def _create_env(root: Path) -> IntegrationTestEnv:
+    """Create the directory structure and config file for a test environment.
+
+    Creates:
+    - {root}/mutable/       - Where backingfiles.img is created
+    - {root}/backingfiles/  - Mount point for backingfiles.img
+    - {root}/config         - Config file
+    """
+    mutable_path = root / "mutable"
+    backingfiles_path = root / "backingfiles"
+    config_path = root / "teslausb.conf"
 
     mutable_path.mkdir()
     backingfiles_path.mkdir()
@@ -198,13 +360,48 @@ RCLONE_PATH=/test
 """
     config_path.write_text(config_content.strip())
 
-    env = IntegrationTestEnv(
-        root=tmp_path,
+    return IntegrationTestEnv(
+        root=root,
         mutable_path=mutable_path,
         backingfiles_path=backingfiles_path,
         config_path=config_path,
     )
 
+
+def run_cli(config_path: Path, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+    """Run teslausb CLI command with the given config file."""
+    cmd = [
+        "python3", "-m", "teslausb.cli",
+        "-c", str(config_path),
+        *args,
+    ]
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+    )
+    if check and result.returncode != 0:
+        # Print output for debugging before raising
+        print(f"Command failed: {' '.join(cmd)}")
+        print(f"stdout: {result.stdout}")
+        print(f"stderr: {result.stderr}")
+        raise subprocess.CalledProcessError(
+            result.returncode,
+            cmd,
+            result.stdout,
+            result.stderr,
+        )
+    return result
+
+
+@pytest.fixture
+def test_env(tmp_path: Path) -> Generator[IntegrationTestEnv, None, None]:
+    """Create an isolated test environment in a temporary directory."""
+    # Clean up any leftover devices from previous test runs
+    _cleanup_loop_devices()
+
+    env = _create_env(tmp_path)
+
     yield env
 
     # Full cleanup after test
@@ -225,49 +422,67 @@ def cli_runner(test_env: IntegrationTestEnv):
         Returns:
             CompletedProcess with stdout/stderr captured
         """
-        cmd = [
-            "python3", "-m", "teslausb.cli",
-            "-c", str(test_env.config_path),
-            *args,
-        ]
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-        )
-        if check and result.returncode != 0:
-            # Print output for debugging before raising
-            print(f"Command failed: {' '.join(cmd)}")
-            print(f"stdout: {result.stdout}")
-            print(f"stderr: {result.stderr}")
-            raise subprocess.CalledProcessError(
-                result.returncode,
-                cmd,
-                result.stdout,
-                result.stderr,
-            )
-        return result
+        return run_cli(test_env.config_path, *args, check=check)
 
     return run
 
 
+def _restore_golden(golden_env: IntegrationTestEnv, env: IntegrationTestEnv) -> None:
+    """Copy the golden backingfiles image into env and mount it.
+
+    The copy is reflinked where the filesystem supports it and sparse
+    otherwise, and is mounted the way init mounts it.
+    """
+    subprocess.run(
+        ["cp", "--reflink=auto", str(golden_env.backingfiles_img), str(env.backingfiles_img)],
+        check=True,
+    )
+    subprocess.run(
+        ["mount", "-o", "loop", str(env.backingfiles_img), str(env.backingfiles_path)],
+        check=True,
+    )
+
+
+@pytest.fixture(scope="session")
+def golden_env(tmp_path_factory: pytest.TempPathFactory) -> IntegrationTestEnv:
+    """An environment initialized once per session, left unmounted.
+
+    init (mkfs.xfs, partitioning and formatting the cam disk) is the
+    slowest step of most tests, so initialized_env copies this image
+    instead of running it again.
+    """
+    env = _create_env(tmp_path_factory.mktemp("golden"))
+    run_cli(env.config_path, "init", "--reserve", "10G")
+
+    # A plain (not lazy) unmount, so the image is complete before it's copied
+    unmount(env.backingfiles_path)
+    _cleanup_loop_devices(str(env.root))
+    return env
+
+
 @pytest.fixture
-def initialized_env(test_env: IntegrationTestEnv, cli_runner) -> IntegrationTestEnv:
+def initialized_env(
+    test_env: IntegrationTestEnv, golden_env: IntegrationTestEnv
+) -> IntegrationTestEnv:
     """Test environment with init already run."""
-    cli_runner("init", "--reserve", "10G")
+    _restore_golden(golden_env, test_env)
     return test_env
 
 
-@pytest.fixture
-def cam_mount(initialized_env: IntegrationTestEnv) -> Generator[Path, None, None]:
-    """Mount the cam_disk and yield the mount point."""
-    mount_point = initialized_env.root / "cam_mount"
-    mount_point.mkdir()
+@pytest.fixture(scope="class")
+def archived_env(
+    tmp_path_factory: pytest.TempPathFactory, golden_env: IntegrationTestEnv
+) -> Generator[IntegrationTestEnv, None, None]:
+    """An initialized environment after one archive of test footage.
 
-    loop_dev, partition, kpartx_used = mount_cam_disk(
-        initialized_env.cam_disk_path, mount_point
-    )
+    Shared by every test in a class, so those tests must only inspect it.
+    """
+    env = _create_env(tmp_path_factory.mktemp("archived"))
+    _restore_golden(golden_env, env)
 
-    yield mount_point
+    write_test_footage(env)
+    run_cli(env.config_path, "archive", check=False)
 
-    unmount_cam_disk(mount_point, loop_dev, kpartx_used)
+    yield env
+
+    _cleanup_mounts_and_devices(env)
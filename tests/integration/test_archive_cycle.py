@@ -3,107 +3,61 @@
 from __future__ import annotations
 
 import json
-import subprocess
-from pathlib import Path
 
 import pytest
 
 from .conftest import (
     IntegrationTestEnv,
-    mount_cam_disk,
-    unmount_cam_disk,
-    create_test_footage,
+    list_snapshots,
+    run_cli,
+    write_test_footage,
 )
 
 pytestmark = pytest.mark.integration
 
+# Keys every snapshot record must carry, on disk and in CLI output
+SNAPSHOT_KEYS = frozenset({"id", "path", "created_at"})
 
-class TestArchiveCycle:
-    """Tests for the full archive cycle."""
 
-    def test_archive_creates_snapshot(
-        self, initialized_env: IntegrationTestEnv, cli_runner, cam_mount: Path
-    ):
-        """Archive should create a snapshot (which may be eagerly deleted after)."""
-        create_test_footage(cam_mount)
+class TestArchiveCycle:
+    """Tests for the full archive cycle.
 
-        # Unmount cam_disk so archive can create snapshot
-        subprocess.run(["umount", str(cam_mount)], check=True)
-
-        # Run archive
-        cli_runner("archive", check=False)
+    All tests share one archive run (archived_env) and only inspect it.
+    """
 
+    def test_archive_creates_snapshot(self, archived_env: IntegrationTestEnv):
+        """Archive should create a complete snapshot (which may be eagerly deleted after)."""
         # Post-archive deletion may have already cleaned up the snapshot
-        snapshots = list(initialized_env.snapshots_path.glob("snap-*"))
+        snapshots = list_snapshots(archived_env)
         assert len(snapshots) <= 1, f"Expected at most 1 snapshot, got {len(snapshots)}"
 
-    def test_archive_snapshot_has_toc(
-        self, initialized_env: IntegrationTestEnv, cli_runner, cam_mount: Path
-    ):
-        """Surviving archive snapshots should have .toc file (completion marker)."""
-        create_test_footage(cam_mount)
-        subprocess.run(["umount", str(cam_mount)], check=True)
-
-        cli_runner("archive", check=False)
-
-        snapshots = list(initialized_env.snapshots_path.glob("snap-*"))
-        assert len(snapshots) <= 1
+        # A surviving snapshot must have its .toc (completion marker) and metadata
         for snap in snapshots:
             assert (snap / "snap.toc").exists(), f"{snap.name} missing .toc file"
 
-    def test_archive_snapshot_has_metadata(
-        self, initialized_env: IntegrationTestEnv, cli_runner, cam_mount: Path
-    ):
-        """Surviving archive snapshots should have metadata.json."""
-        create_test_footage(cam_mount)
-        subprocess.run(["umount", str(cam_mount)], check=True)
-
-        cli_runner("archive", check=False)
-
-        snapshots = list(initialized_env.snapshots_path.glob("snap-*"))
-        assert len(snapshots) <= 1
-        for snap in snapshots:
             metadata_file = snap / "metadata.json"
             assert metadata_file.exists(), f"{snap.name} missing metadata.json"
 
             metadata = json.loads(metadata_file.read_text())
-            assert "id" in metadata
-            assert "path" in metadata
-            assert "created_at" in metadata
+            assert metadata.keys() >= SNAPSHOT_KEYS, f"missing: {SNAPSHOT_KEYS - metadata.keys()}"
 
-    def test_snapshots_command_after_archive(
-        self, initialized_env: IntegrationTestEnv, cli_runner, cam_mount: Path
-    ):
+    def test_snapshots_command_after_archive(self, archived_env: IntegrationTestEnv):
         """After archive, snapshots command output should match disk state."""
-        create_test_footage(cam_mount)
-        subprocess.run(["umount", str(cam_mount)], check=True)
-
-        cli_runner("archive", check=False)
-
-        result = cli_runner("snapshots", "--json")
+        result = run_cli(archived_env.config_path, "snapshots", "--json")
         data = json.loads(result.stdout)
 
         # CLI output should match what's on disk
-        snapshots = list(initialized_env.snapshots_path.glob("snap-*"))
+        snapshots = list_snapshots(archived_env)
         assert len(data) == len(snapshots)
         for entry in data:
-            assert "id" in entry
-            assert "path" in entry
-            assert "created_at" in entry
+            assert entry.keys() >= SNAPSHOT_KEYS, f"missing: {SNAPSHOT_KEYS - entry.keys()}"
 
-    def test_status_shows_snapshot_count(
-        self, initialized_env: IntegrationTestEnv, cli_runner, cam_mount: Path
-    ):
+    def test_status_shows_snapshot_count(self, archived_env: IntegrationTestEnv):
         """After archive, status snapshot count should match disk state."""
-        create_test_footage(cam_mount)
-        subprocess.run(["umount", str(cam_mount)], check=True)
-
-        cli_runner("archive", check=False)
-
-        result = cli_runner("status", "--json")
+        result = run_cli(archived_env.config_path, "status", "--json")
         data = json.loads(result.stdout)
 
-        snapshots = list(initialized_env.snapshots_path.glob("snap-*"))
+        snapshots = list_snapshots(archived_env)
         assert data["snapshots"]["count"] == len(snapshots)
 
 
@@ -111,54 +65,41 @@ class TestMultipleArchiveCycles:
     """Tests for multiple archive cycles."""
 
     def test_stale_snapshots_cleaned_by_next_archive(
-        self, initialized_env: IntegrationTestEnv, cli_runner, cam_mount: Path
+        self, initialized_env: IntegrationTestEnv, cli_runner
     ):
         """Second archive cycle should clean up stale snapshot from first cycle."""
         # First archive
-        create_test_footage(cam_mount, "event1")
-        subprocess.run(["umount", str(cam_mount)], check=True)
+        write_test_footage(initialized_env, "event1")
         cli_runner("archive", check=False)
 
         # Verify first snapshot exists
-        snapshots_after_first = list(initialized_env.snapshots_path.glob("snap-*"))
+        snapshots_after_first = list_snapshots(initialized_env)
         assert len(snapshots_after_first) <= 1, (
             f"Expected at most 1 snapshot after first archive, got {len(snapshots_after_first)}"
         )
 
-        # Remount and add more footage
-        loop_dev, partition, kpartx_used = mount_cam_disk(
-            initialized_env.cam_disk_path, cam_mount
-        )
-
-        create_test_footage(cam_mount, "event2")
-        unmount_cam_disk(cam_mount, loop_dev, kpartx_used)
+        # Add more footage
+        write_test_footage(initialized_env, "event2")
 
         # Second archive — should clean up any stale snapshot from first
         cli_runner("archive", check=False)
 
         # At most 1 snapshot (the current one) — stale ones are eagerly deleted
-        snapshots = list(initialized_env.snapshots_path.glob("snap-*"))
+        snapshots = list_snapshots(initialized_env)
         assert len(snapshots) <= 1, (
             f"Expected at most 1 snapshot (eager deletion), got {len(snapshots)}"
         )
 
     def test_snapshot_ids_increment(
-        self, initialized_env: IntegrationTestEnv, cli_runner, cam_mount: Path
+        self, initialized_env: IntegrationTestEnv, cli_runner
     ):
         """Snapshot IDs should increment monotonically across archive cycles."""
         # First archive
-        create_test_footage(cam_mount, "event1")
-        subprocess.run(["umount", str(cam_mount)], check=True)
+        write_test_footage(initialized_env, "event1")
         cli_runner("archive", check=False)
 
-        # Remount and second archive
-        loop_dev, partition, kpartx_used = mount_cam_disk(
-            initialized_env.cam_disk_path, cam_mount
-        )
-
-        create_test_footage(cam_mount, "event2")
-        unmount_cam_disk(cam_mount, loop_dev, kpartx_used)
-
+        # Second archive
+        write_test_footage(initialized_env, "event2")
         cli_runner("archive", check=False)
 
         # The surviving snapshot should have a higher ID than the first (0)
@@ -2,15 +2,34 @@
 
 from __future__ import annotations
 
-import subprocess
-
+import ctypes
+import ctypes.util
+import os
+from pathlib import Path
 
 import pytest
 
-from .conftest import IntegrationTestEnv
+from .conftest import IntegrationTestEnv, probe_first_partition, reflink_copy
 
 pytestmark = pytest.mark.integration
 
+# statfs(2) f_type of an XFS filesystem
+XFS_SUPER_MAGIC = 0x58465342
+
+
+def _fs_magic(path: Path) -> int:
+    """Get the statfs(2) f_type of the filesystem containing path.
+
+    f_type is the first word of struct statfs on every Linux ABI, so only
+    it is read, into a buffer larger than the whole struct.
+    """
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    buf = (ctypes.c_long * 32)()
+    if libc.statfs(os.fsencode(path), buf) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), str(path))
+    return int(buf[0])
+
 
 class TestInitCommand:
     """Tests for teslausb init."""
@@ -31,10 +50,7 @@ class TestInitCommand:
         cli_runner("init", "--reserve", "10G")
 
         # Check mount point is active
-        result = subprocess.run(
-            ["mountpoint", "-q", str(test_env.backingfiles_path)],
-        )
-        assert result.returncode == 0, "backingfiles should be mounted"
+        assert os.path.ismount(test_env.backingfiles_path), "backingfiles should be mounted"
 
     def test_init_creates_xfs_filesystem(
         self, test_env: IntegrationTestEnv, cli_runner
@@ -42,13 +58,9 @@ class TestInitCommand:
         """Init should create XFS filesystem (required for reflinks)."""
         cli_runner("init", "--reserve", "10G")
 
-        # Check filesystem type
-        result = subprocess.run(
-            ["stat", "-f", "-c", "%T", str(test_env.backingfiles_path)],
-            capture_output=True,
-            text=True,
-        )
-        assert result.stdout.strip() == "xfs"
+        # Check filesystem type with statfs, independently of the CLI's own lookup
+        fs_magic = _fs_magic(test_env.backingfiles_path)
+        assert fs_magic == XFS_SUPER_MAGIC, f"expected XFS, got {fs_magic:#x}"
 
     def test_init_creates_cam_disk(
         self, test_env: IntegrationTestEnv, cli_runner
@@ -58,13 +70,10 @@ class TestInitCommand:
 
         assert test_env.cam_disk_path.exists()
 
-        # Check it has a partition table
-        result = subprocess.run(
-            ["parted", "-s", str(test_env.cam_disk_path), "print"],
-            capture_output=True,
-            text=True,
-        )
-        assert "fat32" in result.stdout.lower()
+        # Check it has a FAT32 partition (MBR types 0x0B/0x0C are FAT32)
+        part_type, fs_type = probe_first_partition(test_env.cam_disk_path)
+        assert part_type in (0x0B, 0x0C), f"unexpected partition type {part_type:#x}"
+        assert fs_type == "FAT32"
 
     def test_init_creates_snapshots_directory(
         self, test_env: IntegrationTestEnv, cli_runner
@@ -117,12 +126,8 @@ class TestXfsReflinks:
 
         # Create a reflink copy
         copy_file = initialized_env.backingfiles_path / "test_copy.bin"
-        result = subprocess.run(
-            ["cp", "--reflink=always", str(test_file), str(copy_file)],
-            capture_output=True,
-        )
+        reflink_copy(test_file, copy_file)
 
-        assert result.returncode == 0, "reflink copy should succeed"
         assert copy_file.exists()
         assert copy_file.read_bytes() == test_file.read_bytes()
 
@@ -132,17 +137,9 @@ class TestXfsReflinks:
         snap_dir.mkdir()
 
         snap_bin = snap_dir / "snap.bin"
-        result = subprocess.run(
-            [
-                "cp", "--reflink=always",
-                str(initialized_env.cam_disk_path),
-                str(snap_bin),
-            ],
-            capture_output=True,
-        )
+        reflink_copy(initialized_env.cam_disk_path, snap_bin)
 
-        assert result.returncode == 0, "reflink copy of cam_disk should work"
-        assert snap_bin.exists()
+        assert snap_bin.stat().st_size == initialized_env.cam_disk_path.stat().st_size
 
 
 class TestDeinitCommand:
@@ -162,18 +159,14 @@ class TestDeinitCommand:
     ):
         """Deinit should unmount backingfiles before removing."""
         # Verify it's mounted
-        result = subprocess.run(
-            ["mountpoint", "-q", str(initialized_env.backingfiles_path)],
-        )
-        assert result.returncode == 0, "should be mounted before deinit"
+        assert os.path.ismount(initialized_env.backingfiles_path), "should be mounted before deinit"
 
         cli_runner("deinit", "--yes")
 
         # Verify it's unmounted
-        result = subprocess.run(
-            ["mountpoint", "-q", str(initialized_env.backingfiles_path)],
+        assert not os.path.ismount(initialized_env.backingfiles_path), (
+            "should be unmounted after deinit"
         )
-        assert result.returncode != 0, "should be unmounted after deinit"
 
     def test_deinit_noop_if_not_initialized(
         self, test_env: IntegrationTestEnv, cli_runner
@@ -12,42 +12,57 @@ reflink copies and real file overwrites to ensure no ENOSPC errors occur.
 from __future__ import annotations
 
 import os
+import random
 import subprocess
 from pathlib import Path
 
 import pytest
 
+from teslausb.filesystem import _syncfs
+
+from .conftest import reflink_copy
+
 pytestmark = pytest.mark.integration
 
 MB = 1024 * 1024
 
+# Written data only has to differ from what the snapshot shares, not be
+# unpredictable, so one seeded buffer serves every write
+_FILL = random.Random(0).randbytes(MB)
+
 
 def _sh(cmd: list[str], **kwargs) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, capture_output=True, text=True, **kwargs)
 
 
-@pytest.fixture
-def xfs_volume(tmp_path: Path):
-    """Create an XFS volume with reflink support.
+@pytest.fixture(scope="class")
+def shared_xfs_volume(tmp_path_factory: pytest.TempPathFactory):
+    """Create an XFS volume with reflink support, once per test class.
 
-    Yields (mount_path, cam_disk_path, cam_size) where cam_size is set to
-    exactly half the actual usable space (measured after mount, not estimated).
+    Yields (mount_path, cam_disk_path, cam_size, cam_fd) where cam_size is
+    set to 45% of the actual usable space (measured after mount, not
+    estimated) and cam_fd is cam_disk opened for writing.
     """
-    img = tmp_path / "backing.img"
-    mount_path = tmp_path / "xfs"
+    root = tmp_path_factory.mktemp("xfs_volume")
+    img = root / "backing.img"
+    mount_path = root / "xfs"
     mount_path.mkdir()
 
-    # 200 MB — large enough for meaningful COW testing, small enough to be fast
-    total_bytes = 200 * MB
+    # 64 MB — large enough for meaningful COW testing, and every cam_disk
+    # write pass scales with the volume size
+    total_bytes = 64 * MB
 
     result = _sh(["truncate", "-s", str(total_bytes), str(img)])
     assert result.returncode == 0, f"truncate failed: {result.stderr}"
-    result = _sh(["mkfs.xfs", "-f", "-m", "reflink=1", str(img)])
+    # Two allocation groups instead of the default four: less per-AG
+    # metadata to write at mkfs time and to reserve at mount time
+    result = _sh(["mkfs.xfs", "-f", "-m", "reflink=1", "-d", "agcount=2", str(img)])
     assert result.returncode == 0, f"mkfs.xfs failed: {result.stderr}"
 
     result = _sh(["mount", "-o", "loop", str(img), str(mount_path)])
     assert result.returncode == 0, f"mount failed: {result.stderr}"
 
+    cam_fd = -1
     try:
         # Measure actual free space (XFS overhead varies by volume size)
         st = os.statvfs(mount_path)
@@ -66,30 +81,58 @@ def xfs_volume(tmp_path: Path):
         snapshots_dir = mount_path / "snapshots"
         snapshots_dir.mkdir()
 
-        yield mount_path, cam_disk, cam_size
+        cam_fd = os.open(cam_disk, os.O_WRONLY)
+        yield mount_path, cam_disk, cam_size, cam_fd
     finally:
+        if cam_fd >= 0:
+            os.close(cam_fd)
         _sh(["umount", "-l", str(mount_path)])
 
 
+@pytest.fixture
+def xfs_volume(shared_xfs_volume):
+    """The shared XFS volume, reset to a fresh cam_disk and no snapshots.
+
+    Yields the same tuple as shared_xfs_volume.
+    """
+    mount_path, cam_disk, cam_size, cam_fd = shared_xfs_volume
+
+    with os.scandir(mount_path / "snapshots") as it:
+        for entry in it:
+            os.unlink(entry.path)
+    # Drop cam_disk's blocks and allocate it again, as a new fallocate would
+    os.ftruncate(cam_fd, 0)
+    os.posix_fallocate(cam_fd, 0, cam_size)
+    _syncfs(cam_fd)
+
+    yield shared_xfs_volume
+
+
 def _df_free_bytes(path: Path) -> int:
     """Get free bytes from statvfs."""
     st = os.statvfs(path)
     return st.f_bavail * st.f_frsize
 
 
-def _overwrite_chunk(path: Path, offset: int, size: int) -> None:
-    """Overwrite a chunk of a file with random data.
+def _overwrite_chunk(fd: int, offset: int, size: int) -> None:
+    """Overwrite a chunk of an open file with pseudo-random data.
 
     Simulates the car writing to cam_disk.bin via the USB gadget, causing
     COW block allocation when a reflink snapshot exists.
     """
-    data = os.urandom(size)
-    fd = os.open(str(path), os.O_WRONLY)
-    try:
-        os.lseek(fd, offset, os.SEEK_SET)
-        os.write(fd, data)
-    finally:
-        os.close(fd)
+    os.pwrite(fd, (_FILL * -(-size // MB))[:size], offset)
+
+
+def _overwrite_full(fd: int, size: int) -> None:
+    """Overwrite the first size bytes of an open file, 8 MB per write.
+
+    Short writes are continued, so running out of space raises OSError
+    rather than leaving the tail silently unwritten.
+    """
+    buf = memoryview(_FILL * 8)
+    offset = 0
+    while offset < size:
+        offset += os.pwrite(fd, buf[: size - offset], offset)
 
 
 class TestSnapshotSpaceInvariant:
@@ -102,16 +145,16 @@ class TestSnapshotSpaceInvariant:
         1. Delete any stale snapshot (eager cleanup)
         2. Create reflink snapshot of cam_disk
         3. Overwrite 25% of cam_disk (simulates car writes causing COW)
-        4. Sync to flush XFS journal
+        4. syncfs to flush the XFS journal
         5. Assert no ENOSPC
         """
-        mount_path, cam_disk, cam_size = xfs_volume
+        mount_path, cam_disk, cam_size, cam_fd = xfs_volume
         snapshots_dir = mount_path / "snapshots"
 
         # Write initial data so the file isn't sparse
         chunk = min(cam_size, 1 * MB)
-        _overwrite_chunk(cam_disk, 0, chunk)
-        subprocess.run(["sync"], check=True)
+        _overwrite_chunk(cam_fd, 0, chunk)
+        _syncfs(cam_fd)
 
         free_before = _df_free_bytes(mount_path)
 
@@ -121,22 +164,19 @@ class TestSnapshotSpaceInvariant:
             # 1. Eager cleanup: delete previous snapshot
             if prev_snap and prev_snap.exists():
                 prev_snap.unlink()
-                subprocess.run(["sync"], check=True)
+                _syncfs(cam_fd)
 
             # 2. Take reflink snapshot
             snap_path = snapshots_dir / f"snap-{cycle:06d}.bin"
-            result = _sh(["cp", "--reflink=always", str(cam_disk), str(snap_path)])
-            assert result.returncode == 0, (
-                f"Cycle {cycle}: reflink failed: {result.stderr}"
-            )
+            reflink_copy(cam_disk, snap_path)
 
             # 3. Overwrite ~25% of cam_disk (COW divergence)
             write_size = cam_size // 4
             offset = (cycle * write_size) % max(1, cam_size - write_size)
-            _overwrite_chunk(cam_disk, offset, write_size)
+            _overwrite_chunk(cam_fd, offset, write_size)
 
-            # 4. Sync
-            subprocess.run(["sync"], check=True)
+            # 4. Sync the test volume
+            _syncfs(cam_fd)
 
             # 5. Must have space left
             free_now = _df_free_bytes(mount_path)
@@ -149,7 +189,7 @@ class TestSnapshotSpaceInvariant:
         # Final cleanup
         if prev_snap and prev_snap.exists():
             prev_snap.unlink()
-            subprocess.run(["sync"], check=True)
+            _syncfs(cam_fd)
 
         # After all snapshots deleted, free space should recover to near the
         # pre-cycle level (within one snapshot's worth of COW overhead)
@@ -166,27 +206,21 @@ class TestSnapshotSpaceInvariant:
         Since cam_disk is half of actual free space, the COW copy should
         fit in the other half.
         """
-        mount_path, cam_disk, cam_size = xfs_volume
+        mount_path, cam_disk, cam_size, cam_fd = xfs_volume
         snapshots_dir = mount_path / "snapshots"
 
         # Fully write cam_disk with known data
-        chunk = 1 * MB
-        for off in range(0, cam_size, chunk):
-            size = min(chunk, cam_size - off)
-            _overwrite_chunk(cam_disk, off, size)
-        subprocess.run(["sync"], check=True)
+        _overwrite_full(cam_fd, cam_size)
+        _syncfs(cam_fd)
 
         # Take snapshot
         snap_path = snapshots_dir / "snap.bin"
-        result = _sh(["cp", "--reflink=always", str(cam_disk), str(snap_path)])
-        assert result.returncode == 0, f"reflink failed: {result.stderr}"
+        reflink_copy(cam_disk, snap_path)
 
         # Overwrite 100% of cam_disk — worst-case COW, every block diverges
-        for off in range(0, cam_size, chunk):
-            size = min(chunk, cam_size - off)
-            _overwrite_chunk(cam_disk, off, size)
+        _overwrite_full(cam_fd, cam_size)
 
-        subprocess.run(["sync"], check=True)
+        _syncfs(cam_fd)
 
         free_after_cow = _df_free_bytes(mount_path)
         assert free_after_cow > 0, (
@@ -200,15 +234,12 @@ class TestSnapshotSpaceInvariant:
 
         This demonstrates the failure mode we're preventing.
         """
-        mount_path, cam_disk, cam_size = xfs_volume
+        mount_path, cam_disk, cam_size, cam_fd = xfs_volume
         snapshots_dir = mount_path / "snapshots"
 
         # Fully write cam_disk
-        chunk = 1 * MB
-        for off in range(0, cam_size, chunk):
-            size = min(chunk, cam_size - off)
-            _overwrite_chunk(cam_disk, off, size)
-        subprocess.run(["sync"], check=True)
+        _overwrite_full(cam_fd, cam_size)
+        _syncfs(cam_fd)
 
         # Keep creating snapshots WITHOUT deleting — COW blocks pile up
         hit_pressure = False
@@ -216,22 +247,21 @@ class TestSnapshotSpaceInvariant:
 
         for cycle in range(5):
             snap_path = snapshots_dir / f"snap-{cycle:06d}.bin"
-            result = _sh(["cp", "--reflink=always", str(cam_disk), str(snap_path)])
-            if result.returncode != 0:
+            try:
+                reflink_copy(cam_disk, snap_path)
+            except OSError:
                 hit_pressure = True
                 break
             snap_paths.append(snap_path)
 
             # Overwrite cam_disk to cause COW divergence
             try:
-                for off in range(0, cam_size, chunk):
-                    size = min(chunk, cam_size - off)
-                    _overwrite_chunk(cam_disk, off, size)
+                _overwrite_full(cam_fd, cam_size)
             except OSError:
                 hit_pressure = True
                 break
 
-            subprocess.run(["sync"], check=True)
+            _syncfs(cam_fd)
             if _df_free_bytes(mount_path) < 1 * MB:
                 hit_pressure = True
                 break
@@ -6,7 +6,7 @@ import json
 
 import pytest
 
-from .conftest import IntegrationTestEnv
+from .conftest import IntegrationTestEnv, list_snapshots
 
 pytestmark = pytest.mark.integration
 
@@ -127,7 +127,7 @@ class TestCleanCommand:
 
         # Verify snapshot was deleted
         assert "Deleted" in result.stdout
-        snapshots_after = list(initialized_env.snapshots_path.glob("snap-*"))
+        snapshots_after = list_snapshots(initialized_env)
         assert len(snapshots_after) == 0
 
     def test_clean_dry_run_with_deletable_snapshot(
@@ -148,5 +148,5 @@ class TestCleanCommand:
         assert "snap-" in result.stdout
 
         # Verify snapshot was NOT actually deleted
-        snapshots_after = list(initialized_env.snapshots_path.glob("snap-*"))
+        snapshots_after = list_snapshots(initialized_env)
         assert len(snapshots_after) == 1
@@ -234,6 +234,26 @@ class TestPostArchiveSnapshotDeletion:
         assert "permission denied" in warning_records[0].message
         assert "will retry next cycle" in warning_records[0].message
 
+    def test_space_info_invalidated_after_snapshot_created(self, coordinator: Coordinator):
+        """Test cached space info is dropped once the cycle's snapshot exists."""
+        success_result = ArchiveResult(
+            snapshot_id=1,
+            state=ArchiveState.COMPLETED,
+            files_transferred=5,
+        )
+        coordinator.archive_manager.archive_new_snapshot = MagicMock(
+            return_value=success_result
+        )
+        # Without the post-archive deletion, only the creation invalidates
+        coordinator.snapshot_manager.delete_snapshot = MagicMock(
+            side_effect=Exception("deletion failed")
+        )
+        coordinator.space_manager.invalidate = MagicMock()
+
+        coordinator._do_archive_cycle()
+
+        coordinator.space_manager.invalidate.assert_called_once()
+
     def test_no_deletion_when_snapshot_id_none(self, coordinator: Coordinator):
         """Test that no deletion is attempted when snapshot_id is None."""
         result_no_snap = ArchiveResult(
@@ -301,19 +321,21 @@ class TestGadgetCoordination:
 
         # Track gadget state during mount_image call
         gadget_enabled_during_mount = None
+        fsck_requested = None
 
         @contextmanager
-        def tracking_mount(path, readonly=True):
-            nonlocal gadget_enabled_during_mount
+        def tracking_mount(path, readonly=True, fsck=False):
+            nonlocal gadget_enabled_during_mount, fsck_requested
             gadget_enabled_during_mount = mock_gadget.is_enabled()
+            fsck_requested = fsck
             yield Path("/mnt/cam")
 
-        with patch("teslausb.mount.mount_image", tracking_mount), \
-             patch("teslausb.mount.fsck_image", return_value=True):
+        with patch("teslausb.mount.mount_image", tracking_mount):
             coordinator_with_gadget._delete_archived_files(result)
 
         assert gadget_enabled_during_mount is False, \
             "Gadget should be disabled during cam_disk mount"
+        assert fsck_requested is True, "cam_disk should be checked before mounting"
         assert mock_gadget.is_enabled(), "Gadget should be re-enabled after cleanup"
 
     def test_gadget_reenabled_after_deletion_failure(
@@ -328,12 +350,11 @@ class TestGadgetCoordination:
         )
 
         @contextmanager
-        def failing_mount(path, readonly=True):
+        def failing_mount(path, readonly=True, fsck=False):
             raise OSError("Mount failed")
             yield  # pragma: no cover
 
-        with patch("teslausb.mount.mount_image", failing_mount), \
-             patch("teslausb.mount.fsck_image", return_value=True):
+        with patch("teslausb.mount.mount_image", failing_mount):
             coordinator_with_gadget._delete_archived_files(result)
 
         assert mock_gadget.is_enabled(), "Gadget must be re-enabled after mount failure"
@@ -355,7 +376,7 @@ class TestGadgetCoordination:
         mount_called = False
 
         @contextmanager
-        def tracking_mount(path, readonly=True):
+        def tracking_mount(path, readonly=True, fsck=False):
             nonlocal mount_called
             mount_called = True
             yield Path("/mnt/cam")
@@ -386,7 +407,7 @@ class TestGadgetCoordination:
         mount_called = False
 
         @contextmanager
-        def tracking_mount(path, readonly=True):
+        def tracking_mount(path, readonly=True, fsck=False):
             nonlocal mount_called
             mount_called = True
             yield Path("/mnt/cam")
@@ -410,13 +431,12 @@ class TestGadgetCoordination:
         mount_called = False
 
         @contextmanager
-        def tracking_mount(path, readonly=True):
+        def tracking_mount(path, readonly=True, fsck=False):
             nonlocal mount_called
             mount_called = True
             yield Path("/mnt/cam")
 
-        with patch("teslausb.mount.mount_image", tracking_mount), \
-             patch("teslausb.mount.fsck_image", return_value=True):
+        with patch("teslausb.mount.mount_image", tracking_mount):
             coordinator._delete_archived_files(result)
 
         assert mount_called, "Should proceed with deletion when no gadget configured"
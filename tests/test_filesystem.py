@@ -7,6 +7,7 @@ from unittest.mock import patch
 import pytest
 
 from teslausb.filesystem import (
+    DirEntry,
     FileNotFoundError_,
     MockFilesystem,
     RealFilesystem,
@@ -124,6 +125,32 @@ class TestMockFilesystem:
 
         assert sorted(entries) == ["file1.txt", "file2.txt", "subdir"]
 
+    def test_scandir(self):
+        """Test scandir reports each entry's type."""
+        fs = MockFilesystem()
+        fs.mkdir(Path("/test/subdir"), parents=True)
+        fs.write_text(Path("/test/file.txt"), "a")
+
+        entries = fs.scandir(Path("/test"))
+
+        assert sorted(entries, key=lambda e: e.name) == [
+            DirEntry("file.txt", is_dir=False, is_file=True),
+            DirEntry("subdir", is_dir=True, is_file=False),
+        ]
+
+    def test_directory_mtime_tracks_entries(self):
+        """Test a directory's mtime changes when entries are added or removed."""
+        fs = MockFilesystem()
+        fs.mkdir(Path("/test"))
+        fs.write_text(Path("/test/file.txt"), "a")
+        mtime = fs.stat(Path("/test")).mtime_ns
+
+        fs.write_text(Path("/test/file.txt"), "b")  # Overwrite in place
+        assert fs.stat(Path("/test")).mtime_ns == mtime
+
+        fs.remove(Path("/test/file.txt"))
+        assert fs.stat(Path("/test")).mtime_ns > mtime
+
     def test_listdir_empty(self):
         """Test listing empty directory."""
         fs = MockFilesystem()
@@ -276,3 +303,25 @@ class TestRealFilesystem:
             result = fs.statvfs(tmp_path)
             mock_syncfs.assert_called_once()
             assert result.block_size == expected.f_frsize
+
+    def test_scandir(self, tmp_path):
+        """scandir reports entry types, following symlinks like is_dir()."""
+        fs = RealFilesystem()
+        (tmp_path / "subdir").mkdir()
+        (tmp_path / "file.txt").write_text("a")
+        (tmp_path / "link").symlink_to(tmp_path / "subdir")
+
+        entries = sorted(fs.scandir(tmp_path), key=lambda e: e.name)
+
+        assert entries == [
+            DirEntry("file.txt", is_dir=False, is_file=True),
+            DirEntry("link", is_dir=True, is_file=False),
+            DirEntry("subdir", is_dir=True, is_file=False),
+        ]
+
+    def test_scandir_missing_directory(self, tmp_path):
+        """scandir raises FileNotFoundError_ for a missing directory."""
+        fs = RealFilesystem()
+
+        with pytest.raises(FileNotFoundError_):
+            fs.scandir(tmp_path / "missing")
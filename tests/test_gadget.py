@@ -137,6 +137,29 @@ class TestMockGadget:
         assert status["luns"][0]["file"] == "/cam.bin"
         assert status["luns"][1]["readonly"] is True
 
+    def test_get_status_after_remove(self):
+        """Test status has no LUNs after the mock gadget is removed."""
+        gadget = MockGadget()
+        gadget.initialize({0: LunConfig(disk_path=Path("/cam.bin"))})
+
+        gadget.remove()
+        status = gadget.get_status()
+
+        assert status["initialized"] is False
+        assert status["luns"] == {}
+
+    def test_get_status_returns_copy(self):
+        """Test modifying a returned status doesn't change later ones."""
+        gadget = MockGadget()
+        gadget.initialize({0: LunConfig(disk_path=Path("/cam.bin"))})
+
+        status = gadget.get_status()
+        status["luns"][1] = {"file": "/music.bin", "readonly": True}
+        with pytest.raises(TypeError):
+            status["luns"][0]["readonly"] = True
+
+        assert gadget.get_status()["luns"] == {0: {"file": "/cam.bin", "readonly": False}}
+
 
 class TestUsbGadget:
     """Tests for UsbGadget.
@@ -210,3 +233,51 @@ class TestUsbGadget:
 
         with pytest.raises(GadgetError, match="At least one LUN"):
             gadget.initialize({})
+
+    def test_get_udc_is_cached(self, tmp_path):
+        """Test the UDC name is looked up once and then cached."""
+        udc_path = tmp_path / "udc"
+        udc_path.mkdir()
+        (udc_path / "fe980000.usb").mkdir()
+
+        gadget = UsbGadget(name="test", configfs=tmp_path)
+        gadget._udc_path = udc_path
+
+        assert gadget._get_udc() == "fe980000.usb"
+
+        # Removing the controller doesn't affect the cached name
+        (udc_path / "fe980000.usb").rmdir()
+        assert gadget._get_udc() == "fe980000.usb"
+
+    def test_get_udc_no_controller_raises(self, tmp_path):
+        """Test _get_udc raises when no UDC is present."""
+        udc_path = tmp_path / "udc"
+        udc_path.mkdir()
+
+        gadget = UsbGadget(name="test", configfs=tmp_path)
+        gadget._udc_path = udc_path
+
+        with pytest.raises(GadgetError, match="No USB Device Controller"):
+            gadget._get_udc()
+
+    def test_initialize_missing_disk_image_raises(self, tmp_path):
+        """Test that initializing with a missing disk image raises error."""
+        gadget = UsbGadget(name="test", configfs=tmp_path)
+        (tmp_path / "disks").mkdir()
+        (tmp_path / "disks" / "cam.bin").write_bytes(b"")
+
+        luns = {
+            0: LunConfig(disk_path=tmp_path / "disks" / "cam.bin"),
+            1: LunConfig(disk_path=tmp_path / "disks" / "music.bin"),
+        }
+
+        with pytest.raises(GadgetError, match="music.bin"):
+            gadget.initialize(luns)
+        assert not gadget.is_initialized()
+
+    def test_initialize_missing_disk_directory_raises(self, tmp_path):
+        """Test that a disk image in a nonexistent directory raises error."""
+        gadget = UsbGadget(name="test", configfs=tmp_path)
+
+        with pytest.raises(GadgetError, match="Disk image not found"):
+            gadget.initialize({0: LunConfig(disk_path=tmp_path / "missing" / "cam.bin")})
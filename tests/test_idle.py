@@ -1,8 +1,13 @@
 """Tests for idle detection."""
 
+import os
+import shutil
+import subprocess
+
 import pytest
 
 from teslausb.idle import (
+    WRITE_THRESHOLD,
     IdleState,
     IdleStatus,
     MockIdleDetector,
@@ -110,6 +115,20 @@ class TestProcIdleDetector:
 
         assert pid == 1234
 
+    def test_find_process_pid_skips_other_entries(self, tmp_path):
+        """Test non-PID entries, other processes and missing comm are skipped."""
+        (tmp_path / "self").mkdir()
+        (tmp_path / "self" / "comm").write_text("file-storage\n")
+        (tmp_path / "1").mkdir()
+        (tmp_path / "1" / "comm").write_text("systemd\n")
+        (tmp_path / "42").mkdir()
+        (tmp_path / "5678").mkdir()
+        (tmp_path / "5678" / "comm").write_text("file-storage\n")
+
+        detector = ProcIdleDetector(proc_path=tmp_path)
+
+        assert detector._find_process_pid() == 5678
+
     def test_get_write_bytes(self, tmp_path):
         """Test reading write_bytes from proc."""
         proc_dir = tmp_path / "1234"
@@ -127,6 +146,21 @@ class TestProcIdleDetector:
 
         assert write_bytes == 2000
 
+    def test_get_write_bytes_rereads_open_file(self, tmp_path):
+        """Test write_bytes is re-read from the kept-open io file."""
+        proc_dir = tmp_path / "1234"
+        proc_dir.mkdir()
+        io_file = proc_dir / "io"
+        io_file.write_text("read_bytes: 1000\nwrite_bytes: 2000\ncancelled_write_bytes: 7\n")
+
+        detector = ProcIdleDetector(proc_path=tmp_path)
+        assert detector._get_write_bytes(1234) == 2000
+
+        io_file.write_text("read_bytes: 1000\nwrite_bytes: 123456789\ncancelled_write_bytes: 7\n")
+        assert detector._get_write_bytes(1234) == 123456789
+
+        detector._close_io_fd()
+
     def test_get_write_bytes_not_found(self, tmp_path):
         """Test reading write_bytes when file doesn't exist."""
         detector = ProcIdleDetector(proc_path=tmp_path)
@@ -151,3 +185,167 @@ class TestProcIdleDetector:
 
         assert status.state == IdleState.UNDETERMINED
         assert status.bytes_written == 0
+
+
+class _FakeClock:
+    """Stand-in for the time module that records sleeps instead of sleeping."""
+
+    def __init__(self, on_sleep):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+        self._on_sleep = on_sleep
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        self.sleeps.append(seconds)
+        self._on_sleep(len(self.sleeps))
+
+
+class TestProcIdleDetectorWait:
+    """Tests for ProcIdleDetector.wait_for_idle sampling behavior."""
+
+    @pytest.fixture
+    def fake_proc(self, tmp_path):
+        """Create a fake /proc with a single file-storage process."""
+        proc_dir = tmp_path / "1234"
+        proc_dir.mkdir()
+        (proc_dir / "comm").write_text("file-storage\n")
+        return tmp_path
+
+    def _install_clock(self, monkeypatch, fake_proc, samples):
+        """Install a fake clock that updates write_bytes before each sample."""
+        io_file = fake_proc / "1234" / "io"
+
+        def on_sleep(n):
+            value = samples[min(n, len(samples)) - 1]
+            io_file.write_text(f"read_bytes: 0\nwrite_bytes: {value}\n")
+
+        clock = _FakeClock(on_sleep)
+        monkeypatch.setattr("teslausb.idle.time", clock)
+        return clock
+
+    def test_idle_after_write_burst(self, monkeypatch, fake_proc):
+        """Test idle is declared after a write burst followed by quiet."""
+        clock = self._install_clock(
+            monkeypatch, fake_proc, [0, 1_000_000, 1_000_000, 1_000_000]
+        )
+        detector = ProcIdleDetector(proc_path=fake_proc)
+
+        assert detector.wait_for_idle(timeout=90) is True
+        assert detector.get_status().state == IdleState.IDLE
+        # Baseline sample, burst, drop to idle, then five quiet seconds
+        assert clock.sleeps == [1] * 8
+
+    def test_pid_lookup_reused_between_samples(self, monkeypatch, fake_proc):
+        """Test /proc is scanned once while the process stays alive."""
+        self._install_clock(monkeypatch, fake_proc, [0, 1_000_000, 1_000_000, 1_000_000])
+        detector = ProcIdleDetector(proc_path=fake_proc)
+
+        calls = []
+        original = detector._find_process_pid
+
+        def counting_find():
+            calls.append(1)
+            return original()
+
+        monkeypatch.setattr(detector, "_find_process_pid", counting_find)
+
+        assert detector.wait_for_idle(timeout=90) is True
+        assert len(calls) == 1
+
+    def test_pid_cached_across_waits(self, monkeypatch, fake_proc):
+        """Test the PID found in one wait is reused by the next."""
+        self._install_clock(monkeypatch, fake_proc, [0, 1_000_000, 1_000_000, 1_000_000])
+        detector = ProcIdleDetector(proc_path=fake_proc)
+
+        calls = []
+        original = detector._find_process_pid
+
+        def counting_find():
+            calls.append(1)
+            return original()
+
+        monkeypatch.setattr(detector, "_find_process_pid", counting_find)
+
+        detector.wait_for_idle(timeout=90)
+        detector.wait_for_idle(timeout=90)
+
+        assert len(calls) == 1
+
+    def test_rescans_after_process_exits(self, monkeypatch, fake_proc):
+        """Test a stale cached PID is dropped once the process is gone."""
+        self._install_clock(monkeypatch, fake_proc, [0, 1_000_000, 1_000_000, 1_000_000])
+        detector = ProcIdleDetector(proc_path=fake_proc)
+        detector.wait_for_idle(timeout=90)
+
+        # procfs fails reads of an exited process's io file with ESRCH
+        def pread_exited(fd, length, offset):
+            raise ProcessLookupError()
+
+        shutil.rmtree(fake_proc / "1234")
+        monkeypatch.setattr("teslausb.idle.time", _FakeClock(lambda n: None))
+        monkeypatch.setattr("teslausb.idle.os.pread", pread_exited)
+
+        assert detector.wait_for_idle(timeout=90) is True
+        assert detector._cached_pid is None
+
+    def test_writes_during_confirmation_window(self, monkeypatch, fake_proc):
+        """Test a burst during the confirmation window resets to writing."""
+        clock = self._install_clock(
+            monkeypatch, fake_proc, [0, 1_000_000, 1_000_000, 2_000_000, 2_000_000]
+        )
+        detector = ProcIdleDetector(proc_path=fake_proc)
+
+        assert detector.wait_for_idle(timeout=90) is True
+        # The second burst restarts the five-second confirmation window
+        assert clock.sleeps == [1] * 10
+
+    def test_sub_threshold_writes_stay_idle(self, monkeypatch, fake_proc):
+        """Test a steady trickle below WRITE_THRESHOLD per second counts as idle."""
+        trickle = WRITE_THRESHOLD * 2 // 5
+        samples = [0, 1_000_000] + [1_000_000 + i * trickle for i in range(1, 20)]
+        clock = self._install_clock(monkeypatch, fake_proc, samples)
+        detector = ProcIdleDetector(proc_path=fake_proc)
+
+        assert detector.wait_for_idle(timeout=90) is True
+        assert clock.sleeps == [1] * 8
+
+    def test_timeout_while_writing(self, monkeypatch, fake_proc):
+        """Test wait_for_idle gives up after the timeout."""
+        samples = [i * 1_000_000 for i in range(20)]
+        self._install_clock(monkeypatch, fake_proc, samples)
+        detector = ProcIdleDetector(proc_path=fake_proc)
+
+        assert detector.wait_for_idle(timeout=10) is False
+        assert detector.get_status().state == IdleState.WRITING
+
+    @pytest.mark.skipif(not hasattr(os, "pidfd_open"), reason="pidfd_open unavailable")
+    def test_wait_for_exit_wakes_on_process_exit(self, tmp_path):
+        """Test the pidfd wakes the wait as soon as the process exits."""
+        proc = subprocess.Popen(["sleep", "30"])
+        detector = ProcIdleDetector(proc_path=tmp_path)
+        detector._pidfd = os.pidfd_open(proc.pid)
+        try:
+            assert detector._wait_for_exit(0.01) is False
+
+            proc.kill()
+            proc.wait()
+
+            assert detector._wait_for_exit(30) is True
+        finally:
+            detector._close_pidfd()
+            proc.kill()
+            proc.wait()
+
+    def test_no_pidfd_for_fake_proc(self, monkeypatch, fake_proc):
+        """Test PIDs from a non-default proc_path aren't pinned with a pidfd."""
+        self._install_clock(monkeypatch, fake_proc, [0, 0])
+        detector = ProcIdleDetector(proc_path=fake_proc)
+
+        detector._sample_process()
+
+        assert detector._cached_pid == 1234
+        assert detector._pidfd is None
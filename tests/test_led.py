@@ -87,6 +87,32 @@ class TestSysfsLedController:
         assert "timer" in controller._available_triggers
         assert "heartbeat" in controller._available_triggers
 
+    def test_triggers_cached_across_instances(self, tmp_path):
+        """Test available triggers are read once per LED."""
+        led_path = tmp_path / "led0"
+        led_path.mkdir()
+        (led_path / "trigger").write_text("[none] timer heartbeat")
+        SysfsLedController(led_path=led_path)
+
+        (led_path / "trigger").write_text("[timer]")
+        controller = SysfsLedController(led_path=led_path)
+
+        assert "heartbeat" in controller._available_triggers
+
+    def test_failed_trigger_read_not_cached(self, tmp_path):
+        """Test a missing or empty trigger file is read again next time."""
+        led_path = tmp_path / "led0"
+        led_path.mkdir()
+        assert SysfsLedController(led_path=led_path)._available_triggers == frozenset()
+
+        (led_path / "trigger").write_text("")
+        assert SysfsLedController(led_path=led_path)._available_triggers == frozenset()
+
+        (led_path / "trigger").write_text("[none] timer heartbeat")
+        controller = SysfsLedController(led_path=led_path)
+
+        assert "timer" in controller._available_triggers
+
     def test_set_pattern_off(self, tmp_path):
         """Test setting LED to off."""
         led_path = tmp_path / "led0"
@@ -163,3 +189,43 @@ class TestSysfsLedController:
 
         # Should not raise, just log
         assert controller.get_pattern() == LedPattern.SLOW_BLINK
+
+    def test_control_files_kept_open(self, tmp_path):
+        """Test LED core files stay open across pattern changes."""
+        led_path = tmp_path / "led0"
+        led_path.mkdir()
+        (led_path / "trigger").write_text("[none] timer heartbeat")
+        (led_path / "delay_off").write_text("")
+        (led_path / "delay_on").write_text("")
+
+        controller = SysfsLedController(led_path=led_path)
+        controller.set_pattern(LedPattern.SLOW_BLINK)
+        trigger_fd = controller._fds["trigger"]
+
+        controller.set_pattern(LedPattern.FAST_BLINK)
+
+        assert controller._fds["trigger"] == trigger_fd
+        assert (led_path / "trigger").read_text() == "timer"
+        assert (led_path / "delay_off").read_text() == "150"
+        assert (led_path / "delay_on").read_text() == "50"
+
+        controller.close()
+        assert controller._fds == {}
+
+    def test_trigger_change_drops_trigger_attributes(self, tmp_path):
+        """Test descriptors to trigger attributes are dropped on trigger change."""
+        led_path = tmp_path / "led0"
+        led_path.mkdir()
+        (led_path / "trigger").write_text("[none] timer heartbeat")
+        (led_path / "delay_off").write_text("")
+        (led_path / "delay_on").write_text("")
+
+        controller = SysfsLedController(led_path=led_path)
+        controller.set_pattern(LedPattern.SLOW_BLINK)
+        assert "delay_on" in controller._fds
+
+        controller.set_pattern(LedPattern.HEARTBEAT)
+
+        assert "delay_on" not in controller._fds
+        assert "delay_off" not in controller._fds
+        controller.close()
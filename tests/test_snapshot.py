@@ -200,6 +200,21 @@ class TestSnapshotManager:
         assert not mock_fs.exists(snap_path)
         assert manager.get_snapshot(snapshot.id) is None
 
+    def test_delete_snapshot_with_extra_files(self, mock_fs: MockFilesystem):
+        """Test deleting a snapshot whose directory holds unexpected files."""
+        manager = SnapshotManager(
+            fs=mock_fs,
+            cam_disk_path=Path("/backingfiles/cam_disk.bin"),
+            snapshots_path=Path("/backingfiles/snapshots"),
+        )
+
+        snapshot = manager.create_snapshot()
+        mock_fs.mkdir(snapshot.path / "extra")
+        mock_fs.write_text(snapshot.path / "extra" / "notes.txt", "x")
+
+        assert manager.delete_snapshot(snapshot.id)
+        assert not mock_fs.exists(snapshot.path)
+
     def test_delete_snapshot_in_use(self, mock_fs: MockFilesystem):
         """Test that deleting a snapshot in use raises error."""
         manager = SnapshotManager(
@@ -313,6 +328,120 @@ class TestSnapshotManager:
         snap3 = manager2.create_snapshot()
         assert snap3.id == 2
 
+    def test_loaded_snapshots_ordered_by_creation_time(self, mock_fs: MockFilesystem):
+        """Test snapshots loaded from disk are ordered by created_at, not by name."""
+        snapshots_path = Path("/backingfiles/snapshots")
+        for snap_id, created_at in [(1, "2024-01-02T00:00:00"), (2, "2024-01-01T00:00:00")]:
+            snap_path = snapshots_path / f"snap-{snap_id:06d}"
+            mock_fs.mkdir(snap_path, parents=True)
+            mock_fs.write_text(
+                snap_path / "metadata.json",
+                f'{{"id": {snap_id}, "path": "{snap_path}", "created_at": "{created_at}"}}',
+            )
+            mock_fs.write_text(snap_path / "snap.toc", "")
+
+        manager = SnapshotManager(
+            fs=mock_fs,
+            cam_disk_path=Path("/backingfiles/cam_disk.bin"),
+            snapshots_path=snapshots_path,
+        )
+
+        assert [s.id for s in manager.get_snapshots()] == [2, 1]
+        new = manager.create_snapshot()
+        assert manager.get_snapshots()[-1] is new
+
+    def test_refresh_picks_up_external_changes(self, mock_fs: MockFilesystem):
+        """Test refresh() notices snapshots added or removed by another manager."""
+        kwargs = {
+            "fs": mock_fs,
+            "cam_disk_path": Path("/backingfiles/cam_disk.bin"),
+            "snapshots_path": Path("/backingfiles/snapshots"),
+        }
+        manager = SnapshotManager(**kwargs)
+        snap = manager.create_snapshot()
+        other = SnapshotManager(**kwargs)
+
+        other.delete_snapshot(snap.id)
+        new = other.create_snapshot()
+        manager.refresh()
+
+        assert [s.id for s in manager.get_snapshots()] == [new.id]
+        assert manager.create_snapshot().id == new.id + 1
+
+    def test_refresh_skips_scan_when_unchanged(self, mock_fs: MockFilesystem):
+        """Test refresh() doesn't list the directory if its mtime is unchanged."""
+        manager = SnapshotManager(
+            fs=mock_fs,
+            cam_disk_path=Path("/backingfiles/cam_disk.bin"),
+            snapshots_path=Path("/backingfiles/snapshots"),
+        )
+        manager.create_snapshot()
+        manager.refresh()
+
+        def fail(path):
+            raise AssertionError("directory was scanned")
+
+        mock_fs.scandir = fail
+        manager.refresh()
+
+    def test_refresh_after_load_skips_scan(self, mock_fs: MockFilesystem):
+        """Test the first refresh() after loading doesn't list the directory again."""
+        kwargs = {
+            "fs": mock_fs,
+            "cam_disk_path": Path("/backingfiles/cam_disk.bin"),
+            "snapshots_path": Path("/backingfiles/snapshots"),
+        }
+        SnapshotManager(**kwargs).create_snapshot()
+        manager = SnapshotManager(**kwargs)
+
+        def fail(path):
+            raise AssertionError("directory was scanned")
+
+        mock_fs.scandir = fail
+        manager.refresh()
+
+        assert len(manager.get_snapshots()) == 1
+
+    def test_refresh_keeps_snapshot_created_during_scan(self, mock_fs: MockFilesystem):
+        """Test a snapshot created while refresh() lists the directory isn't dropped."""
+        manager = SnapshotManager(
+            fs=mock_fs,
+            cam_disk_path=Path("/backingfiles/cam_disk.bin"),
+            snapshots_path=Path("/backingfiles/snapshots"),
+        )
+        manager.create_snapshot()
+        scandir = mock_fs.scandir
+        created = []
+        creator = threading.Thread(target=lambda: created.append(manager.create_snapshot()))
+
+        def scandir_then_create(path):
+            entries = list(scandir(path))
+            # Another thread creates a snapshot right after the listing
+            creator.start()
+            creator.join(timeout=0.1)
+            return entries
+
+        mock_fs.scandir = scandir_then_create
+        manager.refresh()
+        creator.join()
+
+        assert created[0] in manager.get_snapshots()
+
+    def test_refresh_ignores_incomplete_snapshot(self, mock_fs: MockFilesystem):
+        """Test refresh() neither loads nor removes a snapshot being created."""
+        snapshots_path = Path("/backingfiles/snapshots")
+        manager = SnapshotManager(
+            fs=mock_fs,
+            cam_disk_path=Path("/backingfiles/cam_disk.bin"),
+            snapshots_path=snapshots_path,
+        )
+        mock_fs.mkdir(snapshots_path / "snap-000005")
+
+        manager.refresh()
+
+        assert manager.get_snapshots() == []
+        assert mock_fs.exists(snapshots_path / "snap-000005")
+
     def test_concurrent_creates_blocked(self, mock_fs: MockFilesystem):
         """Test that concurrent snapshot creation is blocked."""
         manager = SnapshotManager(
@@ -87,6 +87,15 @@ class TestCalculateCamSize:
             # Should be within one sector of the max
             assert actual >= max_cam_size - SECTOR_SIZE + 1
 
+    def test_exact_for_sizes_beyond_float_precision(self):
+        """Test the overhead is computed exactly even past 2**53 bytes."""
+        backingfiles = 2**60 + 7
+        expected_usable = backingfiles - backingfiles * 3 // 100
+
+        result = calculate_cam_size(backingfiles)
+
+        assert result == (expected_usable // 2) // SECTOR_SIZE * SECTOR_SIZE
+
     def test_small_size_rounds_to_zero(self):
         """Test that very small backingfiles sizes round down to zero gracefully."""
         # A size so small that after overhead and division, it's less than one sector
@@ -104,11 +113,11 @@ class TestSpaceInfo:
         info = SpaceInfo(
             total_bytes=100 * GB,
             free_bytes=50 * GB,
-            used_bytes=50 * GB,
         )
 
         assert info.total_gb == 100.0
         assert info.free_gb == 50.0
+        assert info.used_bytes == 50 * GB
         assert info.used_gb == 50.0
 
     def test_str_representation(self):
@@ -116,7 +125,6 @@ class TestSpaceInfo:
         info = SpaceInfo(
             total_bytes=100 * GB,
             free_bytes=50 * GB,
-            used_bytes=50 * GB,
         )
         s = str(info)
         assert "50.0" in s  # free
@@ -139,3 +147,18 @@ class TestSpaceManager:
 
         assert info.free_bytes == 100 * GB
         assert info.total_bytes == mock_fs.statvfs(Path("/backingfiles")).total_bytes
+
+    def test_get_space_info_is_cached_until_invalidated(self, mock_fs: MockFilesystem):
+        """Test statvfs results are reused briefly and dropped by invalidate()."""
+        mock_fs.set_free_space(100 * GB)
+        manager = SpaceManager(
+            fs=mock_fs,
+            backingfiles_path=Path("/backingfiles"),
+        )
+        assert manager.get_space_info().free_bytes == 100 * GB
+
+        mock_fs.set_free_space(50 * GB)
+        assert manager.get_space_info().free_bytes == 100 * GB
+
+        manager.invalidate()
+        assert manager.get_space_info().free_bytes == 50 * GB
@@ -44,6 +44,12 @@ class TestTemperatureReading:
 
         assert before <= reading.timestamp <= after
 
+    def test_unix_time(self):
+        """Test the reading time is stored as a Unix timestamp."""
+        reading = TemperatureReading(millidegrees=45000, unix_time=1700000000.0)
+
+        assert reading.timestamp == datetime.fromtimestamp(1700000000.0)
+
 
 class TestTemperatureConfig:
     """Tests for TemperatureConfig dataclass."""
@@ -184,6 +190,23 @@ class TestSysfsTemperatureMonitor:
         assert reading is not None
         assert reading.celsius == 65.5
 
+    def test_thermal_file_kept_open(self, tmp_path):
+        """Test the thermal zone file is opened once and re-read in place."""
+        thermal_file = tmp_path / "temp"
+        thermal_file.write_text("50000\n")
+
+        monitor = SysfsTemperatureMonitor(thermal_path=thermal_file)
+        monitor.get_temperature()
+        fd = monitor._fd
+
+        thermal_file.write_text("61000\n")
+        reading = monitor.get_temperature()
+
+        assert monitor._fd == fd
+        assert reading.celsius == 61.0
+        monitor.close()
+        assert monitor._fd is None
+
     def test_get_temperature_file_not_found(self, tmp_path):
         """Test reading when file doesn't exist."""
         monitor = SysfsTemperatureMonitor(thermal_path=tmp_path / "nonexistent")